@@ -0,0 +1,116 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+from reconciliation import binary_entropy
+from simulator import BB84Simulator
+
+# Probability that Alice's and Bob's random bases agree
+SIFTED_FRACTION = 0.5
+
+# Typical reconciliation efficiency f of Cascade at low QBER
+DEFAULT_EFFICIENCY = 1.16
+
+
+def expected_qber(eavesdropper=False, intercept_prob=1.0, noise=0.0):
+    """
+    Expected error rate of the sifted key. An intercept-resend attack on a fraction p
+    of the qubits causes p / 4 errors, and the channel independently flips each bit
+    with probability `noise`.
+    """
+    attack = intercept_prob / 4 if eavesdropper else 0.0
+    return attack + noise - 2 * attack * noise
+
+
+def asymptotic_key_rate(qber, efficiency=DEFAULT_EFFICIENCY):
+    """
+    Shor-Preskill secret key rate per sifted bit: 1 - h(Q) - f * h(Q).
+    """
+    return max(0.0, 1 - binary_entropy(qber) - efficiency * binary_entropy(qber))
+
+
+def finite_key_length(sifted_bits, qber, efficiency=DEFAULT_EFFICIENCY, sample_fraction=0.1,
+                      eps_pe=1e-10, eps_ec=1e-10, eps_pa=1e-10):
+    """
+    Finite-key secret key length from `sifted_bits` sifted bits.
+
+    A fraction of the sifted key is disclosed for parameter estimation. The phase
+    error rate is bounded by the sampled QBER plus a statistical fluctuation term,
+    and the key is charged for error-correction leakage, verification and
+    privacy amplification.
+    """
+    k = math.floor(sifted_bits * sample_fraction)
+    n = sifted_bits - k
+    if n <= 0 or k <= 0:
+        return 0
+
+    fluctuation = math.sqrt((n + k) * (k + 1) * math.log(1 / eps_pe) / (n * k * k))
+    phase_error = min(0.5, qber + fluctuation)
+    length = (n * (1 - binary_entropy(phase_error)) - efficiency * n * binary_entropy(qber)
+              - math.log2(2 / eps_ec) - 2 * math.log2(1 / eps_pa))
+    return max(0, math.floor(length))
+
+
+def analyze(num_qubits, eavesdropper=False, intercept_prob=1.0, noise=0.0,
+            efficiency=DEFAULT_EFFICIENCY, confidence=0.95):
+    """
+    Expected sifted length, QBER and secret key rates of a configuration without
+    sampling any bits. Confidence intervals describe the spread of a single
+    simulated run of `num_qubits` qubits.
+    """
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    qber = expected_qber(eavesdropper, intercept_prob, noise)
+
+    sifted = num_qubits * SIFTED_FRACTION
+    sifted_spread = z * math.sqrt(num_qubits * SIFTED_FRACTION * (1 - SIFTED_FRACTION))
+    qber_spread = z * math.sqrt(qber * (1 - qber) / sifted) if sifted else 0.0
+
+    asymptotic = asymptotic_key_rate(qber, efficiency)
+    finite = finite_key_length(math.floor(sifted), qber, efficiency)
+
+    return {
+        "num_qubits": num_qubits,
+        "sifted_fraction": SIFTED_FRACTION,
+        "sifted_bits": sifted,
+        "sifted_bits_ci": (sifted - sifted_spread, sifted + sifted_spread),
+        "qber": qber,
+        "qber_ci": (max(0.0, qber - qber_spread), min(1.0, qber + qber_spread)),
+        "asymptotic_rate": asymptotic,
+        "asymptotic_rate_per_qubit": asymptotic * SIFTED_FRACTION,
+        "finite_key_length": finite,
+        "finite_rate_per_qubit": finite / num_qubits if num_qubits else 0.0
+    }
+
+
+def cross_validate(num_qubits=100000, eavesdropper=True, intercept_prob=1.0, noise=0.0, runs=20, seed=0):
+    """
+    Compare the analytic QBER and sifted length with the sampling engine over
+    `runs` seeded simulations. Returns both estimates and the fraction of runs
+    whose QBER falls inside the analytic confidence interval.
+    """
+    expected = analyze(num_qubits, eavesdropper, intercept_prob, noise)
+    seeds = np.random.SeedSequence(seed).generate_state(runs)
+
+    qbers, sifted = [], []
+    for run_seed in seeds:
+        sim = BB84Simulator(num_qubits, eavesdropper, seed=int(run_seed), intercept_prob=intercept_prob, noise=noise)
+        sim.run()
+        qbers.append(sim.qber)
+        sifted.append(len(sim.raw_key))
+
+    low, high = expected["qber_ci"]
+    return {
+        "expected_qber": expected["qber"],
+        "sampled_qber": float(np.mean(qbers)),
+        "expected_sifted_bits": expected["sifted_bits"],
+        "sampled_sifted_bits": float(np.mean(sifted)),
+        "qber_coverage": float(np.mean([low <= q <= high for q in qbers]))
+    }
+
+
+if __name__ == "__main__":
+    for eve, p, noise in [(False, 1.0, 0.0), (False, 1.0, 0.03), (True, 0.2, 0.01), (True, 1.0, 0.0)]:
+        result = cross_validate(100000, eve, p, noise)
+        print(f"Eve={eve!s:<5} p={p:.2f} noise={noise:.2f} | "
+              f"QBER expected {result['expected_qber'] * 100:.2f}% sampled {result['sampled_qber'] * 100:.2f}% "
+              f"(coverage {result['qber_coverage'] * 100:.0f}%)")
@@ -0,0 +1,40 @@
+import argparse
+import time
+from simulator import BB84Simulator
+
+
+def time_engine(engine, num_qubits, eavesdropper=True, seed=42):
+    """
+    Run one full BB84 simulation with the given engine and return (seconds, qber).
+    """
+    sim = BB84Simulator(num_qubits=num_qubits, eavesdropper=eavesdropper, seed=seed, engine=engine)
+    start = time.perf_counter()
+    sim.run()
+    elapsed = time.perf_counter() - start
+    return elapsed, sim.qber
+
+
+def benchmark_engines(num_qubits=10**7, eavesdropper=True, seed=42):
+    """
+    Compare the list-based Python engine with the vectorized NumPy engine.
+    """
+    results = {}
+    for engine in ("python", "numpy"):
+        elapsed, qber = time_engine(engine, num_qubits, eavesdropper, seed)
+        results[engine] = {"seconds": elapsed, "qber": qber}
+        print(f"[{engine:>6}] {num_qubits} qubits in {elapsed:.3f}s (QBER {qber * 100:.2f}%)")
+
+    speedup = results["python"]["seconds"] / results["numpy"]["seconds"]
+    results["speedup"] = speedup
+    print(f"NumPy engine speedup: {speedup:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark BB84 simulator engines")
+    parser.add_argument("--qubits", type=int, default=10**7)
+    parser.add_argument("--no-eve", action="store_true", help="Run without the eavesdropper")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    benchmark_engines(args.qubits, eavesdropper=not args.no_eve, seed=args.seed)
@@ -0,0 +1,123 @@
+import numpy as np
+
+# Number of set bits in every possible byte value
+POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+class BitKey:
+    """
+    Compact bit string backed by a numpy.packbits buffer (MSB first, one bit per bit).
+    Unused bits in the last byte are always kept at zero so that XOR, parity and
+    popcount can run over whole bytes.
+    """
+
+    __slots__ = ("packed", "length")
+
+    def __init__(self, packed=None, length=0):
+        if packed is None:
+            packed = np.zeros(0, dtype=np.uint8)
+        self.packed = np.asarray(packed, dtype=np.uint8)
+        self.length = length
+
+        if len(self.packed) != (length + 7) // 8:
+            raise ValueError(f"Buffer of {len(self.packed)} bytes cannot hold exactly {length} bits")
+        mask = (0xFF << (8 - length % 8)) & 0xFF
+        if length % 8 and len(self.packed) and int(self.packed[-1]) & ~mask & 0xFF:
+            # Clear the padding bits on a copy; the buffer may belong to the caller
+            self.packed = self.packed.copy()
+            self.packed[-1] &= mask
+
+    @classmethod
+    def from_bits(cls, bits):
+        """
+        Build a key from a BitKey, a '0'/'1' string, or any sequence/array of 0/1 values.
+        """
+        if isinstance(bits, BitKey):
+            return bits
+        if isinstance(bits, str):
+            bits = np.frombuffer(bits.encode(), dtype=np.uint8) - ord('0')
+        bits = np.asarray(bits, dtype=np.uint8)
+        return cls(np.packbits(bits), len(bits))
+
+    @classmethod
+    def from_bytes(cls, data, length=None):
+        packed = np.frombuffer(bytes(data), dtype=np.uint8).copy()
+        if length is None:
+            length = len(packed) * 8
+        return cls(packed[:(length + 7) // 8], length)
+
+    @classmethod
+    def concatenate(cls, keys):
+        keys = [cls.from_bits(key) for key in keys]
+        if all(len(key) % 8 == 0 for key in keys[:-1]):
+            # Byte-aligned parts can be joined without unpacking
+            packed = np.concatenate([key.packed for key in keys] or [np.zeros(0, dtype=np.uint8)])
+            return cls(packed, sum(len(key) for key in keys))
+        return cls.from_bits(np.concatenate([key.to_array() for key in keys]))
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self.to_array().tolist())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step == 1 and start % 8 == 0:
+                length = max(stop - start, 0)
+                first = start // 8
+                return BitKey(self.packed[first:first + (length + 7) // 8].copy(), length)
+            return BitKey.from_bits(self.to_array()[index])
+
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("BitKey index out of range")
+        return int(self.packed[index // 8] >> (7 - index % 8)) & 1
+
+    def __xor__(self, other):
+        other = BitKey.from_bits(other)
+        if len(other) != self.length:
+            raise ValueError(f"Cannot XOR keys of length {self.length} and {len(other)}")
+        return BitKey(self.packed ^ other.packed, self.length)
+
+    def __eq__(self, other):
+        if not isinstance(other, BitKey):
+            return NotImplemented
+        return self.length == other.length and np.array_equal(self.packed, other.packed)
+
+    __hash__ = None
+
+    def __str__(self):
+        return (self.to_array() + ord('0')).tobytes().decode()
+
+    def __repr__(self):
+        preview = str(self[:64]) + ("..." if self.length > 64 else "")
+        return f"BitKey({self.length} bits: {preview})"
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    def popcount(self):
+        return int(POPCOUNT_TABLE[self.packed].sum(dtype=np.int64))
+
+    def parity(self):
+        folded = np.bitwise_xor.reduce(self.packed) if len(self.packed) else 0
+        return int(POPCOUNT_TABLE[folded]) & 1
+
+    def to_array(self):
+        """
+        Unpacked uint8 array of 0/1 values.
+        """
+        return np.unpackbits(self.packed, count=self.length)
+
+    def tolist(self):
+        return self.to_array().tolist()
+
+    def to_bytes(self):
+        return self.packed.tobytes()
+
+    def hex(self):
+        return self.packed.tobytes().hex()
@@ -1,14 +1,28 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from simulator import BB84Simulator
 from post_processing import apply_post_processing
+from sim_cache import cached_summary
+from simulator import SimulationCancelled
+from visualization import draw_bit_agreement, draw_mask_raster, draw_match_rate
 
 import matplotlib.pyplot as plt
 import seaborn as sns
-import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
+POLL_INTERVAL_MS = 100
+
+# Longest key / index list written verbatim to the output tab
+PREVIEW_BITS = 256
+PREVIEW_INDICES = 32
+
+
+def key_preview(key):
+    text = str(key[:PREVIEW_BITS])
+    return f"{text}... ({len(key)} bits)" if len(key) > PREVIEW_BITS else text
+
 
 class QKDApp:
     def __init__(self, root):
@@ -18,11 +32,18 @@ class QKDApp:
 
         self.num_qubits_var = tk.IntVar(value=100)
         self.eve_var = tk.BooleanVar(value=False)
+        self.seed_var = tk.IntVar(value=42)
 
         self.sim_result = None
-        self.final_key = []
+        self.final_key = None
         self.current_figure = None
 
+        # Background job state, polled from the Tk main loop via root.after
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.worker = None
+        self.status_var = tk.StringVar(value="Idle")
+
         self.build_ui()
 
     def build_ui(self):
@@ -49,10 +70,21 @@ class QKDApp:
         ttk.Label(frame, text="Number of Qubits:").grid(row=0, column=0, sticky="w")
         ttk.Entry(frame, textvariable=self.num_qubits_var, width=10).grid(row=0, column=1)
 
-        ttk.Checkbutton(frame, text="Enable Eve (Eavesdropper)", variable=self.eve_var).grid(row=1, column=0, columnspan=2, sticky="w", pady=5)
+        ttk.Label(frame, text="Seed:").grid(row=1, column=0, sticky="w")
+        ttk.Entry(frame, textvariable=self.seed_var, width=10).grid(row=1, column=1)
 
-        ttk.Button(frame, text="▶ Run BB84 Simulation", command=self.run_simulation).grid(row=2, column=0, pady=10)
-        ttk.Button(frame, text="🔐 Run Post-Processing", command=self.run_post_processing).grid(row=2, column=1, pady=10)
+        ttk.Checkbutton(frame, text="Enable Eve (Eavesdropper)", variable=self.eve_var).grid(row=2, column=0, columnspan=2, sticky="w", pady=5)
+
+        self.run_button = ttk.Button(frame, text="▶ Run BB84 Simulation", command=self.run_simulation)
+        self.run_button.grid(row=3, column=0, pady=10)
+        self.post_button = ttk.Button(frame, text="🔐 Run Post-Processing", command=self.run_post_processing)
+        self.post_button.grid(row=3, column=1, pady=10)
+        self.cancel_button = ttk.Button(frame, text="■ Cancel", command=self.cancel_job, state="disabled")
+        self.cancel_button.grid(row=3, column=2, pady=10)
+
+        self.progress_bar = ttk.Progressbar(frame, orient=tk.HORIZONTAL, length=300, mode="determinate", maximum=100)
+        self.progress_bar.grid(row=4, column=0, columnspan=3, sticky="we", pady=5)
+        ttk.Label(frame, textvariable=self.status_var).grid(row=5, column=0, columnspan=3, sticky="w")
 
     def build_visuals_tab(self):
         top_frame = ttk.LabelFrame(self.tab_visuals, text="Plot Controls", padding=10)
@@ -79,53 +111,168 @@ class QKDApp:
         ttk.Button(button_frame, text="💾 Export Key to File", command=self.export_key).pack()
 
     def run_simulation(self):
-        num_qubits = self.num_qubits_var.get()
-        eavesdropper = self.eve_var.get()
+        self.start_worker(self.simulation_worker, self.num_qubits_var.get(), self.eve_var.get(), self.seed_var.get())
 
-        sim = BB84Simulator(num_qubits=num_qubits, eavesdropper=eavesdropper)
-        sim.run()
-        self.sim_result = sim.summary()
-        self.final_key = []
+    def run_post_processing(self):
+        if not self.sim_result:
+            messagebox.showwarning("Run Simulation First", "Please run the simulation first.")
+            return
+
+        if self.is_busy():
+            return
+        self.status_var.set("Post-processing...")
+        self.progress_bar.configure(mode="indeterminate")
+        self.progress_bar.start()
+        self.start_worker(self.post_processing_worker, self.sim_result['alice_key'], self.sim_result['raw_key'],
+                          self.seed_var.get())
+
+    def is_busy(self):
+        if self.worker and self.worker.is_alive():
+            messagebox.showinfo("Busy", "A job is already running.")
+            return True
+        return False
+
+    def start_worker(self, target, *args):
+        if self.is_busy():
+            return
 
-        raw_key = ''.join(map(str, self.sim_result['raw_key']))
-        qber = self.sim_result['qber']
+        self.cancel_event.clear()
+        self.set_busy(True)
+        self.worker = threading.Thread(target=target, args=args, daemon=True)
+        self.worker.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+
+    def set_busy(self, busy):
+        self.run_button.state(['disabled'] if busy else ['!disabled'])
+        self.post_button.state(['disabled'] if busy else ['!disabled'])
+        self.cancel_button.state(['!disabled'] if busy else ['disabled'])
+        if not busy:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+
+    def cancel_job(self):
+        self.cancel_event.set()
+        self.status_var.set("Cancelling...")
+
+    def simulation_worker(self, num_qubits, eavesdropper, seed):
+        # Runs on the worker thread: only talk to the UI through the message queue
+        def progress(done, total):
+            self.messages.put(("progress", done, total))
+            return not self.cancel_event.is_set()
+
+        try:
+            summary = cached_summary(num_qubits, eavesdropper, seed, progress=progress)
+        except SimulationCancelled as e:
+            self.messages.put(("cancelled", str(e)))
+            return
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+            return
+        self.messages.put(("simulation_done", summary))
+
+    def post_processing_worker(self, alice_key, bob_key, seed):
+        # Log lines go through the queue; redirecting stdout would capture every thread's output
+        def log(text):
+            if text.strip():
+                self.messages.put(("log", text.strip() + "\n"))
+
+        try:
+            final_key = apply_post_processing(alice_key, bob_key, seed=seed, log=log)
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+            return
+        self.messages.put(("post_processing_done", final_key))
+
+    def poll_worker(self):
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_message(*message)
+
+        if self.worker.is_alive() or not self.messages.empty():
+            self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+        else:
+            self.set_busy(False)
+
+    def handle_message(self, kind, *payload):
+        if kind == "progress":
+            done, total = payload
+            self.progress_bar['value'] = 100 * done / total if total else 100
+            self.status_var.set(f"Simulating: {done:,} / {total:,} qubits")
+        elif kind == "log":
+            self.output_text.insert(tk.END, payload[0])
+            self.output_text.see(tk.END)
+        elif kind == "simulation_done":
+            self.show_simulation_result(payload[0])
+        elif kind == "post_processing_done":
+            if self.cancel_event.is_set():
+                self.status_var.set("Post-processing cancelled")
+                self.output_text.insert(tk.END, "\n[Post-Processing] Cancelled, result discarded\n")
+                return
+            self.final_key = payload[0]
+            if not len(self.final_key):
+                self.status_var.set("No secure key extractable")
+                self.output_text.insert(tk.END, "\n[Post-Processing] No secure key extractable at this QBER and key length\n")
+                return
+            self.status_var.set("Post-processing complete")
+            self.output_text.insert(tk.END, f"\n[Post-Processing Final Key]:\n{key_preview(self.final_key)}\n")
+        elif kind == "qber_comparison_done":
+            self.draw_qber_comparison(*payload)
+        elif kind == "cancelled":
+            self.status_var.set("Simulation cancelled")
+            self.output_text.insert(tk.END, f"\n[Cancelled] {payload[0]}\n")
+        elif kind == "error":
+            self.status_var.set("Failed")
+            messagebox.showerror("Error", payload[0])
+
+    def show_simulation_result(self, summary):
+        self.sim_result = summary
+        self.final_key = None
+        self.status_var.set("Simulation complete")
+
+        matching = summary['matching_indices']
+        indices = list(map(int, matching[:PREVIEW_INDICES]))
+        if len(matching) > PREVIEW_INDICES:
+            indices = f"{indices}... ({len(matching)} positions)"
 
         output = (
             f"[Simulation Result]\n"
-            f"Qubits Sent         : {num_qubits}\n"
-            f"Eavesdropper Present: {eavesdropper}\n"
-            f"QBER                : {qber}%\n"
-            f"Raw Key             : {raw_key}\n"
-            f"Matching Indices    : {self.sim_result['matching_indices']}\n"
+            f"Qubits Sent         : {summary['num_qubits']}\n"
+            f"Eavesdropper Present: {summary['eavesdropper']}\n"
+            f"QBER                : {summary['qber']}%\n"
+            f"Raw Key             : {key_preview(summary['raw_key'])}\n"
+            f"Matching Indices    : {indices}\n"
         )
 
         self.output_text.delete(1.0, tk.END)
         self.output_text.insert(tk.END, output)
 
-    def run_post_processing(self):
-        if not self.sim_result:
-            messagebox.showwarning("Run Simulation First", "Please run the simulation first.")
-            return
-
-        alice_key = [self.sim_result['alice_bits'][i] for i in self.sim_result['matching_indices']]
-        bob_key = self.sim_result['raw_key']
-        self.final_key = apply_post_processing(alice_key, bob_key)
-
-        key_str = ''.join(map(str, self.final_key))
-        self.output_text.insert(tk.END, f"\n[Post-Processing Final Key]:\n{key_str}\n")
-
     def export_key(self):
         if not self.sim_result:
             messagebox.showerror("Error", "No simulation data to export.")
             return
 
-        key_to_save = self.final_key if self.final_key else self.sim_result['raw_key']
-        key_str = ''.join(map(str, key_to_save))
+        if self.final_key is not None and not len(self.final_key):
+            messagebox.showerror("Error", "No secure key extractable: post-processing produced an empty key.")
+            return
+
+        # Before post-processing, the sifted raw key is exported
+        key_to_save = self.final_key if self.final_key is not None else self.sim_result['raw_key']
 
-        filepath = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt")])
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("Hex files", "*.hex"), ("Binary files", "*.bin")]
+        )
         if filepath:
-            with open(filepath, 'w') as f:
-                f.write(key_str)
+            if filepath.endswith(".bin"):
+                with open(filepath, 'wb') as f:
+                    f.write(key_to_save.to_bytes())
+            else:
+                key_str = key_to_save.hex() if filepath.endswith(".hex") else str(key_to_save)
+                with open(filepath, 'w') as f:
+                    f.write(key_str)
             messagebox.showinfo("Export Complete", f"Key saved to {filepath}")
 
     def display_plot(self, fig: Figure):
@@ -148,13 +295,28 @@ class QKDApp:
             messagebox.showinfo("Saved", f"Plot saved to {file_path}")
 
     def show_qber_comparison(self):
-        sim_eve = BB84Simulator(self.num_qubits_var.get(), eavesdropper=True)
-        sim_eve.run()
-
-        sim_no_eve = BB84Simulator(self.num_qubits_var.get(), eavesdropper=False)
-        sim_no_eve.run()
+        # Either run may miss the cache and need a full simulation, so both run on the worker
+        self.start_worker(self.qber_comparison_worker, self.num_qubits_var.get(), self.seed_var.get())
+
+    def qber_comparison_worker(self, num_qubits, seed):
+        def progress(done, total):
+            self.messages.put(("progress", done, total))
+            return not self.cancel_event.is_set()
+
+        try:
+            res_eve = cached_summary(num_qubits, True, seed, progress=progress)
+            res_no_eve = cached_summary(num_qubits, False, seed, progress=progress)
+        except SimulationCancelled as e:
+            self.messages.put(("cancelled", str(e)))
+            return
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+            return
+        self.messages.put(("qber_comparison_done", res_eve['qber'], res_no_eve['qber']))
 
-        values = [sim_eve.qber * 100, sim_no_eve.qber * 100]
+    def draw_qber_comparison(self, qber_eve, qber_no_eve):
+        self.status_var.set("QBER comparison ready")
+        values = [qber_eve, qber_no_eve]
         labels = ["With Eve", "Without Eve"]
 
         fig = Figure(figsize=(5, 4))
@@ -172,19 +334,10 @@ class QKDApp:
             messagebox.showwarning("No Data", "Run the simulation first.")
             return
 
-        alice_bases = self.sim_result['alice_bases']
-        bob_bases = self.sim_result['bob_bases']
-        match = [1 if a == b else 0 for a, b in zip(alice_bases, bob_bases)]
-        indices = np.arange(len(alice_bases))
-
         fig = Figure(figsize=(8, 3))
         ax = fig.add_subplot(111)
-        ax.scatter(indices, match, c=match, cmap='coolwarm', marker='|', s=100)
-        ax.set_title("Alice vs Bob Basis Match")
-        ax.set_xlabel("Qubit Index")
-        ax.set_yticks([0, 1])
-        ax.set_ylabel("Match")
-        ax.grid(True, linestyle='--', alpha=0.6)
+        draw_mask_raster(ax, self.sim_result['sift_mask'])
+        ax.set_title("Alice vs Bob Basis Match (red = match)", loc='left')
 
         self.display_plot(fig)
 
@@ -193,18 +346,11 @@ class QKDApp:
             messagebox.showwarning("No Data", "Run the simulation first.")
             return
 
-        agreements = [
-            1 if self.sim_result['alice_bits'][i] == self.sim_result['bob_results'][i] else 0
-            for i in self.sim_result['matching_indices']
-        ]
-        indices = np.arange(len(agreements))
-
         fig = Figure(figsize=(8, 2))
         ax = fig.add_subplot(111)
-        sns.heatmap([agreements], cmap='Greens', cbar=True, xticklabels=indices, ax=ax)
-        ax.set_title("Bit Agreement in Matching Bases")
-        ax.set_xlabel("Matching Index")
-        ax.set_yticks([])
+        draw_bit_agreement(ax, self.sim_result['alice_bits'], self.sim_result['bob_results'],
+                           self.sim_result['matching_indices'])
+        ax.set_title("Bit Agreement in Matching Bases", loc='left')
 
         self.display_plot(fig)
 
@@ -213,16 +359,10 @@ class QKDApp:
             messagebox.showwarning("No Data", "Run the simulation first.")
             return
 
-        total = self.sim_result['num_qubits']
-        data = [1 if i in self.sim_result['matching_indices'] else 0 for i in range(total)]
-
         fig = Figure(figsize=(8, 2))
         ax = fig.add_subplot(111)
-        ax.bar(range(total), data, color='skyblue')
+        draw_match_rate(ax, self.sim_result['sift_mask'])
         ax.set_title("Basis Matching Distribution")
-        ax.set_xlabel("Qubit Index")
-        ax.set_ylabel("Match")
-        ax.set_yticks([0, 1])
 
         self.display_plot(fig)
 
@@ -0,0 +1,230 @@
+import functools
+import numpy as np
+from bitkey import BitKey
+from reconciliation import binary_entropy
+
+# Code rates available to the reconciliation engine, highest first
+CODE_RATES = (0.9, 0.85, 0.8, 0.75, 0.7, 0.65, 0.6, 0.55, 0.5, 0.45, 0.4, 0.35, 0.3)
+
+DEFAULT_FRAME_LENGTH = 8192
+
+# Extra syndrome fraction reserved per frame, divided by sqrt(frame length):
+# short random codes decode far less reliably at the same rate
+FINITE_LENGTH_MARGIN = 3.0
+
+# Normalization factor of the min-sum check update
+MIN_SUM_SCALE = 0.8
+
+# LLR magnitude for padding bits that both parties know to be zero
+KNOWN_BIT_LLR = 100.0
+
+
+class ParityCheckMatrix:
+    """
+    Sparse binary parity-check matrix H (m x n) in CSR form.
+    Every non-zero entry is an edge of the Tanner graph; edges are stored in row
+    order, and `column_order`/`column_starts` give the same edges grouped by column.
+    """
+
+    def __init__(self, indptr, indices, num_columns):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.num_rows = len(self.indptr) - 1
+        self.num_columns = num_columns
+
+        self.row_of_edge = np.repeat(np.arange(self.num_rows), np.diff(self.indptr))
+        self.column_order = np.argsort(self.indices, kind="stable")
+        self.column_starts = np.searchsorted(self.indices[self.column_order], np.arange(num_columns))
+
+    @classmethod
+    def random_regular(cls, num_columns, rate, column_weight=3, seed=None):
+        """
+        Random column-regular code: every column joins `column_weight` checks and
+        the resulting sockets are dealt evenly over the rows.
+        """
+        rng = np.random.default_rng(seed)
+        num_rows = max(1, round(num_columns * (1 - rate)))
+
+        columns = rng.permutation(np.repeat(np.arange(num_columns), column_weight))
+        rows = np.arange(len(columns)) % num_rows
+
+        # Sort by (row, column) and drop repeated edges
+        keys = np.unique(rows * num_columns + columns)
+        rows, columns = keys // num_columns, keys % num_columns
+
+        indptr = np.zeros(num_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
+        return cls(indptr, columns, num_columns)
+
+    @property
+    def rate(self):
+        return 1 - self.num_rows / self.num_columns
+
+    def syndrome(self, bits):
+        """
+        H @ bits mod 2 for one frame (n,) or a batch of frames (frames, n).
+        """
+        bits = np.asarray(bits, dtype=np.uint8)
+        return np.bitwise_xor.reduceat(bits[..., self.indices], self.indptr[:-1], axis=-1)
+
+    def decode(self, syndrome, llr, max_iterations=50):
+        """
+        Batched normalized min-sum decoding of error patterns e with H @ e = syndrome.
+        `llr` holds the prior log-likelihood ratio of every bit being 0, with shape
+        (frames, n). Frames leave the working batch as soon as they converge.
+        Returns (decoded bits, converged mask, iterations used).
+        """
+        syndrome = np.asarray(syndrome, dtype=bool)
+        llr = np.asarray(llr, dtype=np.float32)
+        starts = self.indptr[:-1]
+        edge_rows = self.row_of_edge
+
+        decoded = (llr < 0).astype(np.uint8)
+        converged = np.all(self.syndrome(decoded) == syndrome, axis=1)
+
+        # Working batch of frames that still have to converge
+        frames = np.flatnonzero(~converged)
+        prior = llr[frames]
+        target = syndrome[frames][:, edge_rows]
+        var_to_check = prior[:, self.indices]
+
+        iteration = 0
+        while iteration < max_iterations and len(frames):
+            iteration += 1
+
+            # Check update: sign product and min / second min of the other edges
+            magnitude = np.abs(var_to_check)
+            negative = var_to_check < 0
+            row_negative = np.bitwise_xor.reduceat(negative, starts, axis=1)[:, edge_rows]
+            min1 = np.minimum.reduceat(magnitude, starts, axis=1)[:, edge_rows]
+            is_min = magnitude == min1
+            min2 = np.minimum.reduceat(np.where(is_min, np.inf, magnitude), starts, axis=1)[:, edge_rows]
+            tied = np.add.reduceat(is_min, starts, axis=1)[:, edge_rows] > 1
+
+            check_magnitude = np.where(is_min & ~tied, min2, min1) * MIN_SUM_SCALE
+            check_to_var = np.where(row_negative ^ negative ^ target, -check_magnitude, check_magnitude)
+
+            # Variable update: prior plus all incoming check messages
+            total = prior + np.add.reduceat(check_to_var[:, self.column_order], self.column_starts, axis=1)
+            var_to_check = total[:, self.indices] - check_to_var
+
+            hard = (total < 0).astype(np.uint8)
+            done = np.all(self.syndrome(hard) == syndrome[frames], axis=1)
+            decoded[frames] = hard
+            if done.any():
+                converged[frames[done]] = True
+                keep = ~done
+                frames, prior, target, var_to_check = frames[keep], prior[keep], target[keep], var_to_check[keep]
+
+        return decoded, converged, iteration
+
+
+def select_code_rate(qber, efficiency=1.45, frame_length=DEFAULT_FRAME_LENGTH):
+    """
+    Highest available rate whose syndrome covers f * h(QBER) bits per key bit plus
+    a finite-length margin, or None if the QBER is too high for every available rate.
+    """
+    needed = efficiency * binary_entropy(qber) + FINITE_LENGTH_MARGIN / np.sqrt(frame_length)
+    for rate in CODE_RATES:
+        if 1 - rate >= needed:
+            return rate
+    return None
+
+
+@functools.lru_cache(maxsize=16)
+def code_for_rate(rate, frame_length=DEFAULT_FRAME_LENGTH, seed=0):
+    """
+    Shared parity-check matrix for a rate; both parties derive it from the same seed.
+    """
+    return ParityCheckMatrix.random_regular(frame_length, rate, seed=seed)
+
+
+def ldpc_reconciliation(alice_key, bob_key, qber, frame_length=DEFAULT_FRAME_LENGTH,
+                        max_iterations=50, seed=0):
+    """
+    One-way syndrome reconciliation: Alice sends the syndromes of all her frames in a
+    single message and Bob decodes his error pattern frame-by-frame in one batch.
+    The code rate is chosen from the measured QBER (e.g. BB84Simulator.qber).
+    Keys are split into equal frames of at most `frame_length` bits, so short keys
+    get a short code and only pay for the syndrome of their own length; the few
+    leftover positions are padded with bits known to both sides (shortening).
+
+    Returns Bob's corrected key and a stats dict. Frames that fail to decode would
+    still hold errors, so Bob announces them (`failed_frames`) and their bits are
+    left out of the returned key; Alice drops the same bits with drop_failed_frames().
+    If the QBER is too high
+    for every code rate the protocol aborts: the key is empty and `aborted` is set.
+    """
+    alice = BitKey.from_bits(alice_key).to_array()
+    bob = BitKey.from_bits(bob_key).to_array()
+    n = len(alice)
+    if len(bob) != n:
+        raise ValueError(f"Keys must have equal length, got {n} and {len(bob)}")
+
+    num_frames = -(-n // frame_length)
+    frame_length = -(-n // num_frames) if n else frame_length
+    rate = select_code_rate(qber, frame_length=frame_length)
+    if rate is None or n == 0:
+        return BitKey(), {
+            "rate": rate,
+            "frames": 0,
+            "frame_length": frame_length,
+            "failed_frames": [],
+            "discarded_bits": 0,
+            "iterations": 0,
+            "leaked_bits": 0,
+            "efficiency": float("inf"),
+            "aborted": rate is None
+        }
+
+    code = code_for_rate(rate, frame_length, seed)
+    padded = num_frames * frame_length
+
+    alice_frames = np.zeros(padded, dtype=np.uint8)
+    bob_frames = np.zeros(padded, dtype=np.uint8)
+    alice_frames[:n] = alice
+    bob_frames[:n] = bob
+    alice_frames = alice_frames.reshape(num_frames, frame_length)
+    bob_frames = bob_frames.reshape(num_frames, frame_length)
+
+    # Alice -> Bob: all syndromes in one round trip
+    alice_syndrome = code.syndrome(alice_frames)
+
+    prior = np.log((1 - qber) / qber) if qber > 0 else KNOWN_BIT_LLR
+    llr = np.full(padded, min(prior, KNOWN_BIT_LLR))
+    llr[n:] = KNOWN_BIT_LLR
+    llr = llr.reshape(num_frames, frame_length)
+
+    errors, converged, iterations = code.decode(
+        alice_syndrome ^ code.syndrome(bob_frames), llr, max_iterations
+    )
+    kept = np.repeat(converged, frame_length)[:n]
+    corrected = (bob_frames ^ errors).ravel()[:n][kept]
+
+    # Syndromes of failed frames were disclosed too, so they still count as leaked
+    leaked = code.num_rows * num_frames
+    stats = {
+        "rate": rate,
+        "frames": num_frames,
+        "frame_length": frame_length,
+        "failed_frames": np.flatnonzero(~converged).tolist(),
+        "discarded_bits": n - int(kept.sum()),
+        "iterations": iterations,
+        "leaked_bits": leaked,
+        "efficiency": leaked / (n * binary_entropy(qber)) if n and 0 < qber < 1 else float("inf"),
+        "aborted": False
+    }
+    return BitKey.from_bits(corrected), stats
+
+
+def drop_failed_frames(key, stats):
+    """
+    Remove the bits of the frames listed in stats["failed_frames"] from a key,
+    so Alice's key lines up with the corrected key Bob got from ldpc_reconciliation.
+    """
+    bits = BitKey.from_bits(key).to_array()
+    kept = np.ones(len(bits), dtype=bool)
+    frame_length = stats["frame_length"]
+    for frame in stats["failed_frames"]:
+        kept[frame * frame_length:(frame + 1) * frame_length] = False
+    return BitKey.from_bits(bits[kept])
@@ -1,81 +1,168 @@
 import hashlib
 import math
 import random
+import numpy as np
+from bitkey import BitKey
+from ldpc import ldpc_reconciliation
+from reconciliation import cascade_reconciliation
 from simulator import BB84Simulator
+from toeplitz import secure_key_length, toeplitz_hash
 
 def parity_reconciliation(alice_key, bob_key):
     """
     Perform basic parity block reconciliation.
     If parities don't match, drop the block (simple, non-interactive).
-    Returns reconciled keys for both parties.
+    Returns Bob's reconciled key as a BitKey.
     """
     block_size = 4
-    alice_blocks = [alice_key[i:i+block_size] for i in range(0, len(alice_key), block_size)]
-    bob_blocks = [bob_key[i:i+block_size] for i in range(0, len(bob_key), block_size)]
+    alice_bits = BitKey.from_bits(alice_key).to_array()
+    bob_bits = BitKey.from_bits(bob_key).to_array()
 
-    reconciled_key = []
+    num_blocks = min(len(alice_bits), len(bob_bits)) // block_size  # skip incomplete blocks
+    alice_blocks = alice_bits[:num_blocks * block_size].reshape(num_blocks, block_size)
+    bob_blocks = bob_bits[:num_blocks * block_size].reshape(num_blocks, block_size)
 
-    for ablock, bblock in zip(alice_blocks, bob_blocks):
-        if len(ablock) != len(bblock):
-            continue  # skip incomplete blocks
+    alice_parity = np.bitwise_xor.reduce(alice_blocks, axis=1)
+    bob_parity = np.bitwise_xor.reduce(bob_blocks, axis=1)
 
-        alice_parity = sum(ablock) % 2
-        bob_parity = sum(bblock) % 2
+    # Keep Bob's version of every block whose parity matches, discard the rest
+    return BitKey.from_bits(bob_blocks[alice_parity == bob_parity].ravel())
 
-        if alice_parity == bob_parity:
-            reconciled_key.extend(bblock)  # keep Bob's version
-        # else: discard this block
 
-    return reconciled_key
-
-
-def privacy_amplification(shared_key, target_length=None):
+def privacy_amplification(shared_key, target_length=None, seed=None):
     """
-    Simple privacy amplification using XOR folding.
-    Reduces the length of the key to ensure any info Eve has is minimized.
+    Privacy amplification by Toeplitz hashing (2-universal, FFT-accelerated).
+    Compresses the key so that any partial info Eve has is removed; use
+    toeplitz.secure_key_length() to choose target_length. `seed` selects the
+    Toeplitz matrix: it is public, but Alice and Bob must use the same value
+    to end up with the same key.
     """
+    if seed is None:
+        raise ValueError("Privacy amplification needs the Toeplitz seed shared by Alice and Bob")
+    shared_key = BitKey.from_bits(shared_key)
+
     if target_length is None:
         # Default: halve the key length
         target_length = len(shared_key) // 2
 
-    if len(shared_key) < 2:
-        return shared_key  # nothing to fold
+    return toeplitz_hash(shared_key, min(target_length, len(shared_key)), seed)
+
+
+def sha256_hash_bits(bits, target_length=128):
+    """
+    Hashes the packed key bytes using SHA-256 and returns the first target_length bits.
+    """
+    key = BitKey.from_bits(bits)
+    hashed = hashlib.sha256(key.to_bytes()).digest()
+    return BitKey.from_bytes(hashed)[:target_length]
 
-    while len(shared_key) > target_length:
-        half = len(shared_key) // 2
-        folded_key = [shared_key[i] ^ shared_key[i + half] for i in range(half)]
-        shared_key = folded_key
 
-    return shared_key
+def estimate_qber(alice_key, bob_key):
+    """
+    Fraction of differing bits between the two keys.
+    (Simulation shortcut: a real link estimates this from a disclosed sample.)
+    """
+    alice_key = BitKey.from_bits(alice_key)
+    if len(alice_key) == 0:
+        return 0.0
+    return (alice_key ^ BitKey.from_bits(bob_key)).popcount() / len(alice_key)
 
 
-def sha256_hash_bits(bits, target_length=128):
+def reconcile(alice_key, bob_key, qber, method="cascade"):
     """
-    Hashes the bitstring using SHA-256 and returns the first target_length bits.
+    Correct Bob's key with interactive Cascade or one-way LDPC syndrome decoding.
     """
-    bit_string = ''.join(map(str, bits))
-    hashed = hashlib.sha256(bit_string.encode()).hexdigest()
-    bin_hash = bin(int(hashed, 16))[2:].zfill(256)
-    return [int(b) for b in bin_hash[:target_length]]
+    if method == "cascade":
+        return cascade_reconciliation(alice_key, bob_key, qber)
+    if method == "ldpc":
+        return ldpc_reconciliation(alice_key, bob_key, qber)
+    raise ValueError(f"Unknown reconciliation method '{method}'")
+
 
+def report_failed_frames(stats, log=print):
+    # Failed LDPC frames are dropped from both keys rather than hashed with errors in them
+    if stats.get("failed_frames"):
+        log(f"[Reconciliation] {len(stats['failed_frames'])} of {stats['frames']} frames failed to decode; "
+            f"their {stats['discarded_bits']} bits were discarded")
 
-def apply_post_processing(alice_bits, bob_bits):
+
+def report_final_key(final_key, log=print):
+    if len(final_key):
+        log(f"[Privacy Amplification] Final key length: {len(final_key)}")
+    else:
+        log("[Privacy Amplification] No secure key extractable: the QBER and reconciliation leakage "
+            "use up the whole key")
+
+
+def apply_post_processing(alice_bits, bob_bits=None, qber=None, method="cascade", seed=0, log=print,
+                          return_stats=False):
     """
-    Main function: Reconcile and amplify keys
+    Main function: Reconcile and amplify keys.
+    If only one argument is given, it is treated as a stream of sifted blocks
+    from BB84Simulator.stream() and each block is processed as it arrives.
+    `seed` is the public Toeplitz seed that both parties pass to get the same
+    final key. The result is an empty BitKey when no secure key can be extracted.
+    Progress lines go to `log`, e.g. a GUI callback instead of stdout. With
+    `return_stats`, returns (final key, reconciliation stats) instead, so callers
+    can see leaked bits and any frames that failed to decode.
     """
-    print(f"\n[Post-Processing] Starting with raw key of length {len(bob_bits)}")
+    if bob_bits is None:
+        return apply_post_processing_stream(alice_bits, method, seed, log, return_stats)
+
+    log(f"\n[Post-Processing] Starting with raw key of length {len(bob_bits)}")
+
+    if qber is None:
+        qber = estimate_qber(alice_bits, bob_bits)
 
     # 1. Reconciliation
-    reconciled = parity_reconciliation(alice_bits, bob_bits)
-    print(f"[Reconciliation] Key length after parity check: {len(reconciled)}")
+    reconciled, stats = reconcile(alice_bits, bob_bits, qber, method)
+    if stats.get("aborted"):
+        log(f"[Reconciliation] {method} aborted: QBER of {qber * 100:.2f}% is too high")
+    else:
+        log(f"[Reconciliation] {method} leaked {stats['leaked_bits']} bits (f = {stats['efficiency']:.3f})")
+    report_failed_frames(stats, log)
 
     # 2. Privacy Amplification
-    final_key = privacy_amplification(reconciled)
-    print(f"[Privacy Amplification] Final key length: {len(final_key)}")
+    target_length = secure_key_length(len(reconciled), qber, stats["leaked_bits"])
+    final_key = privacy_amplification(reconciled, target_length, seed)
+    report_final_key(final_key, log)
+
+    return (final_key, stats) if return_stats else final_key
+
+
+def apply_post_processing_stream(blocks, method="cascade", seed=0, log=print, return_stats=False):
+    """
+    Reconcile and amplify each sifted block of a simulator stream independently,
+    so only one block of raw key is held in memory at a time. Block i is hashed
+    with the Toeplitz seed [seed, i].
+    """
+    final_parts = []
+    block = None
+    totals = {"blocks": 0, "leaked_bits": 0, "frames": 0, "failed_frames": [], "discarded_bits": 0}
+
+    for index, block in enumerate(blocks):
+        reconciled, stats = reconcile(block["alice_key"], block["bob_key"], block["qber"], method)
+        totals["blocks"] += 1
+        totals["leaked_bits"] += stats["leaked_bits"]
+        totals["frames"] += stats.get("frames", 0)
+        totals["failed_frames"] += [(index, frame) for frame in stats.get("failed_frames", [])]
+        totals["discarded_bits"] += stats.get("discarded_bits", 0)
+        target_length = secure_key_length(len(reconciled), block["qber"], stats["leaked_bits"])
+        final_parts.append(privacy_amplification(reconciled, target_length, [seed, index]))
+
+    final_key = BitKey.concatenate(final_parts)
 
-    return final_key
+    if block is None:
+        log("\n[Post-Processing] Stream was empty")
+        return (final_key, totals) if return_stats else final_key
 
+    log(f"\n[Post-Processing] Streamed {block['qubits_sent']} qubits, "
+        f"{block['sifted_bits']} sifted bits (QBER {block['qber'] * 100:.2f}%)")
+    log(f"[Reconciliation] {method} leaked {totals['leaked_bits']} bits")
+    report_failed_frames(totals, log)
+    report_final_key(final_key, log)
 
+    return (final_key, totals) if return_stats else final_key
 
 
 if __name__ == "__main__":
@@ -85,10 +172,10 @@ if __name__ == "__main__":
     result = sim.summary()
 
     # Get Alice's original and Bob's raw key (at matching indices)
-    alice_key = [result['alice_bits'][i] for i in result['matching_indices']]
+    alice_key = result['alice_key']
     bob_key = result['raw_key']
 
     # Apply post-processing
-    final_secure_key = apply_post_processing(alice_key, bob_key)
+    final_secure_key = apply_post_processing(alice_key, bob_key, seed=42)
 
-    print(f"[Final Key] {''.join(map(str, final_secure_key))}")
\ No newline at end of file
+    print(f"[Final Key] {final_secure_key}")
\ No newline at end of file
@@ -0,0 +1,135 @@
+import math
+import numpy as np
+from bitkey import BitKey
+
+
+def binary_entropy(p):
+    """
+    Shannon binary entropy h(p) in bits.
+    """
+    if p <= 0 or p >= 1:
+        return 0.0
+    return -p * math.log2(p) - (1 - p) * math.log2(1 - p)
+
+
+def cascade_block_sizes(qber, key_length, passes=4):
+    """
+    QBER-adaptive Cascade block sizes: k1 = ceil(0.73 / QBER), doubling every pass.
+    """
+    if qber <= 0:
+        first = key_length
+    else:
+        first = math.ceil(0.73 / qber)
+    first = max(2, min(first, key_length))
+    return [min(first * 2 ** i, key_length) for i in range(passes)]
+
+
+def prefix_parity(bits):
+    """
+    Prefix XOR with a leading zero, so parity of bits[lo:hi] is prefix[hi] ^ prefix[lo].
+    """
+    prefix = np.zeros(len(bits) + 1, dtype=np.uint8)
+    np.bitwise_xor.accumulate(bits, out=prefix[1:])
+    return prefix
+
+
+def cascade_reconciliation(alice_key, bob_key, qber, passes=4, seed=None):
+    """
+    Interactive Cascade error correction of Bob's key against Alice's.
+
+    Each pass shuffles the key (pass 1 keeps the original order), splits it into
+    blocks of a QBER-adaptive size, compares all block parities at once and runs a
+    binary search inside every mismatched block to locate and flip one error. The
+    searches of a pass run in lockstep on prefix parities. Every flip re-opens the
+    blocks that contain it in earlier passes, which are then fixed one by one.
+
+    Returns Bob's corrected key and a stats dict with the leaked parity bits and
+    the reconciliation efficiency f = leaked / (n * h(QBER)).
+    """
+    alice = BitKey.from_bits(alice_key).to_array()
+    bob = BitKey.from_bits(bob_key).to_array().copy()
+    n = len(alice)
+    if len(bob) != n:
+        raise ValueError(f"Keys must have equal length, got {n} and {len(bob)}")
+
+    rng = np.random.default_rng(seed)
+    block_sizes = cascade_block_sizes(qber, n, passes) if n else []
+    leaked = 0
+    corrected = 0
+
+    # Per processed pass: shuffled order, block id of every original position,
+    # block size and current Alice/Bob parity difference of every block
+    orders, block_of, sizes, diffs = [], [], [], []
+
+    def flip(positions):
+        nonlocal corrected
+        bob[positions] ^= 1
+        corrected += len(positions)
+        reopened = []
+        for p in range(len(orders)):
+            np.bitwise_xor.at(diffs[p], block_of[p][positions], 1)
+            reopened.extend((p, int(block)) for block in np.unique(block_of[p][positions]) if diffs[p][block])
+        return reopened
+
+    def search_block(p, block):
+        nonlocal leaked
+        indices = orders[p][block * sizes[p]:(block + 1) * sizes[p]]
+        while len(indices) > 1:
+            half = indices[:len(indices) // 2]
+            leaked += 1
+            if np.bitwise_xor.reduce(alice[half]) != np.bitwise_xor.reduce(bob[half]):
+                indices = half
+            else:
+                indices = indices[len(half):]
+        return indices
+
+    for pass_index, k in enumerate(block_sizes):
+        order = np.arange(n) if pass_index == 0 else rng.permutation(n)
+        inverse = np.empty(n, dtype=np.int64)
+        inverse[order] = np.arange(n)
+
+        starts = np.arange(0, n, k)
+        ends = np.minimum(starts + k, n)
+        alice_prefix = prefix_parity(alice[order])
+        bob_prefix = prefix_parity(bob[order])
+        diff_prefix = alice_prefix ^ bob_prefix
+
+        # Alice discloses the parity of every block of this pass
+        leaked += len(starts)
+        diff = diff_prefix[ends] ^ diff_prefix[starts]
+
+        orders.append(order)
+        block_of.append(inverse // k)
+        sizes.append(k)
+        diffs.append(diff)
+
+        # Binary search in all mismatched blocks simultaneously. Blocks are disjoint,
+        # so every search can use the prefix parities taken before any flip.
+        odd = np.flatnonzero(diff)
+        lo, hi = starts[odd], ends[odd]
+        while len(lo) and np.any(hi - lo > 1):
+            active = hi - lo > 1
+            mid = (lo + hi) // 2
+            leaked += int(np.count_nonzero(active))
+            left = (alice_prefix[mid] ^ alice_prefix[lo]) != (bob_prefix[mid] ^ bob_prefix[lo])
+            hi = np.where(active & left, mid, hi)
+            lo = np.where(active & ~left, mid, lo)
+
+        queue = flip(order[lo]) if len(lo) else []
+
+        # Cascade: corrections make blocks of earlier passes odd again
+        while queue:
+            p, block = queue.pop()
+            if diffs[p][block]:
+                queue.extend(flip(search_block(p, block)))
+
+    efficiency = leaked / (n * binary_entropy(qber)) if n and 0 < qber < 1 else float("inf")
+
+    stats = {
+        "passes": len(block_sizes),
+        "block_sizes": block_sizes,
+        "leaked_bits": leaked,
+        "corrected_bits": corrected,
+        "efficiency": efficiency
+    }
+    return BitKey.from_bits(bob), stats
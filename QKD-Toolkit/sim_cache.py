@@ -0,0 +1,111 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from bitkey import BitKey
+from simulator import BB84Simulator
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def estimate_size(value):
+    """
+    Approximate memory footprint of a simulation summary in bytes.
+    """
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, BitKey):
+        return value.nbytes
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(element_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def element_size(value):
+    """
+    Bytes a list entry adds beyond its pointer. Small ints (-5..256) and
+    one-character strings are shared by the interpreter and cost nothing extra;
+    anything else, such as the positions in matching_indices, is its own object.
+    """
+    if type(value) is int and -5 <= value <= 256:
+        return 0
+    if type(value) is str and len(value) == 1:
+        return 0
+    return estimate_size(value)
+
+
+class SimulationCache:
+    """
+    Thread-safe LRU cache of simulation summaries, keyed by
+    (num_qubits, eavesdropper, seed, intercept_prob, noise) and capped by total size.
+    Cached summaries are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return  # never evict everything for a single oversized result
+
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Shared by the Tk and Streamlit front ends
+simulation_cache = SimulationCache()
+
+
+def cached_summary(num_qubits, eavesdropper, seed, intercept_prob=1.0, noise=0.0, cache=simulation_cache,
+                   progress=None):
+    """
+    Summary of a seeded BB84 run, simulated only on the first request for its parameters.
+    `progress` is passed on to BB84Simulator.run() when a simulation is needed.
+    """
+    key = (num_qubits, eavesdropper, seed, intercept_prob, noise)
+    summary = cache.get(key)
+    if summary is None:
+        sim = BB84Simulator(num_qubits=num_qubits, eavesdropper=eavesdropper, seed=seed,
+                            intercept_prob=intercept_prob, noise=noise)
+        sim.run(progress=progress)
+        summary = sim.summary()
+        cache.put(key, summary)
+    return summary
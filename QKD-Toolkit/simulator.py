@@ -1,12 +1,42 @@
 import random
 import numpy as np
+from bitkey import BitKey
+
+ENGINES = ("numpy", "python")
+
+# Basis labels indexed by the uint8 basis codes used by the numpy engine
+BASIS_LABELS = np.array(['Z', 'X'])
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+class SimulationCancelled(Exception):
+    """
+    Raised when a progress callback asks a running simulation to stop.
+    """
+
+
+def measure_bits(bits, bases, measure_bases, guesses):
+    """
+    Measure qubits prepared as (bits, bases) in `measure_bases`.
+    Matching bases reproduce the bit, mismatched bases yield the random guess.
+    """
+    return np.where(measure_bases == bases, bits, guesses)
 
 
 class BB84Simulator:
-    def __init__(self, num_qubits=100, eavesdropper=False, seed=None):
+    def __init__(self, num_qubits=100, eavesdropper=False, seed=None, engine="numpy",
+                 intercept_prob=1.0, noise=0.0):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+
         self.num_qubits = num_qubits
         self.eavesdropper = eavesdropper
+        self.intercept_prob = intercept_prob  # fraction of qubits Eve intercepts and resends
+        self.noise = noise                    # bit-flip probability of the channel
+        self.engine = engine
         self.random = random.Random(seed)
+        self.rng = np.random.default_rng(seed)
 
         # Protocol data
         self.alice_bits = []
@@ -15,17 +45,55 @@ class BB84Simulator:
         self.bob_results = []
         self.eve_bases = []
         self.eve_results = []
+        self.intercepted = []
 
         self.matching_indices = []
-        self.raw_key = []
+        self.alice_key = BitKey()
+        self.raw_key = BitKey()
+        self.sift_mask = None
         self.qber = 0.0
 
+    def random_bit_array(self, length):
+        """
+        Draw `length` uniform bits as a uint8 array of 0/1, unpacked from random bytes.
+        """
+        packed = np.frombuffer(self.rng.bytes((length + 7) // 8), dtype=np.uint8)
+        return np.unpackbits(packed, count=length)
+
+    def random_mask(self, length, probability):
+        """
+        Boolean array where each entry is True with the given probability.
+        """
+        if probability >= 1:
+            return np.ones(length, dtype=bool)
+        if probability <= 0:
+            return np.zeros(length, dtype=bool)
+        return self.rng.random(length, dtype=np.float32) < probability
+
+    def transmit(self, alice_bits, alice_bases, bob_bases, eve_bases=None, eve_results=None, intercepted=None):
+        """
+        Bob's measurement results for one batch of qubits (numpy engine).
+        Intercepted qubits arrive as Eve's resent states, every result then goes
+        through the noisy channel.
+        """
+        sent_bits, sent_bases = alice_bits, alice_bases
+        if eve_results is not None:
+            sent_bits = np.where(intercepted, eve_results, alice_bits)
+            sent_bases = np.where(intercepted, eve_bases, alice_bases)
+
+        length = len(alice_bits)
+        results = measure_bits(sent_bits, sent_bases, bob_bases, self.random_bit_array(length))
+        return results ^ self.random_mask(length, self.noise)
+
     def generate_random_bits(self, length):
         return [self.random.randint(0, 1) for _ in range(length)]
 
     def generate_random_bases(self, length):
         return [self.random.choice(['Z', 'X']) for _ in range(length)]
 
+    # The step methods below are the list-based python engine; the numpy engine
+    # runs the same protocol per chunk in simulate_chunks()
+
     def encode_qubits(self):
         self.alice_bits = self.generate_random_bits(self.num_qubits)
         self.alice_bases = self.generate_random_bases(self.num_qubits)
@@ -33,6 +101,10 @@ class BB84Simulator:
     def intercept_eavesdropper(self):
         self.eve_bases = self.generate_random_bases(self.num_qubits)
         self.eve_results = []
+        if self.intercept_prob >= 1:
+            self.intercepted = [True] * self.num_qubits
+        else:
+            self.intercepted = [self.random.random() < self.intercept_prob for _ in range(self.num_qubits)]
 
         for bit, basis, eve_basis in zip(self.alice_bits, self.alice_bases, self.eve_bases):
             if basis == eve_basis:
@@ -49,7 +121,7 @@ class BB84Simulator:
             alice_basis = self.alice_bases[i]
             bob_basis = self.bob_bases[i]
 
-            if self.eavesdropper:
+            if self.eavesdropper and self.intercepted[i]:
                 eve_bit = self.eve_results[i]
                 eve_basis = self.eve_bases[i]
 
@@ -64,27 +136,60 @@ class BB84Simulator:
                 else:
                     self.bob_results.append(self.random.randint(0, 1))
 
+            # Channel noise flips the received bit
+            if self.noise > 0 and self.random.random() < self.noise:
+                self.bob_results[-1] ^= 1
+
     def extract_key(self):
+        if self.engine == "numpy":
+            self.sift_mask = self.alice_bases == self.bob_bases
+            self.matching_indices = np.flatnonzero(self.sift_mask)
+            self.alice_key = BitKey.from_bits(self.alice_bits[self.sift_mask])
+            self.raw_key = BitKey.from_bits(self.bob_results[self.sift_mask])
+            return
+
         self.matching_indices = []
-        self.raw_key = []
+        alice_key = []
+        raw_key = []
 
         for i in range(self.num_qubits):
             if self.alice_bases[i] == self.bob_bases[i]:
                 self.matching_indices.append(i)
-                self.raw_key.append(self.bob_results[i])
+                alice_key.append(self.alice_bits[i])
+                raw_key.append(self.bob_results[i])
+
+        self.alice_key = BitKey.from_bits(alice_key)
+        self.raw_key = BitKey.from_bits(raw_key)
+        self.sift_mask = np.zeros(self.num_qubits, dtype=bool)
+        self.sift_mask[self.matching_indices] = True
 
     def compute_qber(self):
-        if not self.matching_indices:
+        if len(self.matching_indices) == 0:
             self.qber = 0.0
             return
 
+        if self.engine == "numpy":
+            error_count = (self.alice_key ^ self.raw_key).popcount()
+            self.qber = error_count / len(self.matching_indices)
+            return
+
         error_count = 0
         for i in self.matching_indices:
             if self.alice_bits[i] != self.bob_results[i]:
                 error_count += 1
         self.qber = error_count / len(self.matching_indices)
 
-    def run(self):
+    def run(self, progress=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Run the full protocol. The numpy engine simulates in chunks, so a seeded run
+        gives the same result with or without a `progress(done, total)` callback.
+        The callback is invoked after each chunk; returning False from it stops the
+        run with SimulationCancelled.
+        """
+        if self.engine == "numpy":
+            self.run_chunked(progress, chunk_size)
+            return
+
         self.encode_qubits()
         if self.eavesdropper:
             self.intercept_eavesdropper()
@@ -92,15 +197,108 @@ class BB84Simulator:
         self.extract_key()
         self.compute_qber()
 
+        if progress is not None:
+            progress(self.num_qubits, self.num_qubits)
+
+    def run_chunked(self, progress=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        fields = ["alice_bits", "alice_bases", "bob_bases", "bob_results"]
+        if self.eavesdropper:
+            fields += ["eve_bases", "eve_results", "intercepted"]
+        arrays = {field: np.empty(self.num_qubits, dtype=np.uint8) for field in fields}
+
+        done = 0
+        for chunk in self.simulate_chunks(chunk_size):
+            length = len(chunk["alice_bits"])
+            for field in fields:
+                arrays[field][done:done + length] = chunk[field]
+            done += length
+            if progress is not None and progress(done, self.num_qubits) is False:
+                raise SimulationCancelled(f"Simulation cancelled after {done} of {self.num_qubits} qubits")
+
+        for field in fields:
+            setattr(self, field, arrays[field])
+        if self.eavesdropper:
+            self.intercepted = self.intercepted.astype(bool)
+        self.extract_key()
+        self.compute_qber()
+
+    def simulate_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yield the per-qubit protocol arrays of consecutive chunks (numpy engine).
+        """
+        qubits_sent = 0
+        while qubits_sent < self.num_qubits:
+            length = min(chunk_size, self.num_qubits - qubits_sent)
+            qubits_sent += length
+
+            chunk = {
+                "alice_bits": self.random_bit_array(length),
+                "alice_bases": self.random_bit_array(length)
+            }
+            if self.eavesdropper:
+                chunk["eve_bases"] = self.random_bit_array(length)
+                chunk["eve_results"] = measure_bits(chunk["alice_bits"], chunk["alice_bases"],
+                                                    chunk["eve_bases"], self.random_bit_array(length))
+                chunk["intercepted"] = self.random_mask(length, self.intercept_prob)
+                chunk["bob_bases"] = self.random_bit_array(length)
+                chunk["bob_results"] = self.transmit(chunk["alice_bits"], chunk["alice_bases"], chunk["bob_bases"],
+                                                     chunk["eve_bases"], chunk["eve_results"], chunk["intercepted"])
+            else:
+                chunk["bob_bases"] = self.random_bit_array(length)
+                chunk["bob_results"] = self.transmit(chunk["alice_bits"], chunk["alice_bases"], chunk["bob_bases"])
+            yield chunk
+
+    def stream(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Simulate the protocol in fixed-size chunks and yield one sifted block per chunk.
+        Only the current chunk is held in memory, so peak memory is bounded by
+        `chunk_size` rather than `num_qubits`. Each block carries Alice's and Bob's
+        sifted bits plus running totals for the whole stream so far.
+        """
+        qubits_sent = 0
+        sifted_bits = 0
+        errors = 0
+
+        for chunk in self.simulate_chunks(chunk_size):
+            alice_bits, alice_bases = chunk["alice_bits"], chunk["alice_bases"]
+            bob_bases, bob_results = chunk["bob_bases"], chunk["bob_results"]
+            length = len(alice_bits)
+
+            sift_mask = alice_bases == bob_bases
+            alice_key = BitKey.from_bits(alice_bits[sift_mask])
+            bob_key = BitKey.from_bits(bob_results[sift_mask])
+
+            qubits_sent += length
+            sifted_bits += len(bob_key)
+            errors += (alice_key ^ bob_key).popcount()
+            self.qber = errors / sifted_bits if sifted_bits else 0.0
+
+            yield {
+                "alice_key": alice_key,
+                "bob_key": bob_key,
+                "qubits_sent": qubits_sent,
+                "sifted_bits": sifted_bits,
+                "errors": errors,
+                "qber": self.qber
+            }
+
     def summary(self):
+        # The numpy engine returns its arrays as they are; converting them to lists
+        # would multiply the memory of large runs. Bases become 'Z'/'X' label arrays.
+        alice_bases, bob_bases = self.alice_bases, self.bob_bases
+        if self.engine == "numpy":
+            alice_bases, bob_bases = BASIS_LABELS[alice_bases], BASIS_LABELS[bob_bases]
+
         return {
             "num_qubits": self.num_qubits,
             "eavesdropper": self.eavesdropper,
             "alice_bits": self.alice_bits,
-            "alice_bases": self.alice_bases,
-            "bob_bases": self.bob_bases,
+            "alice_bases": alice_bases,
+            "bob_bases": bob_bases,
             "bob_results": self.bob_results,
             "matching_indices": self.matching_indices,
+            "sift_mask": self.sift_mask,
+            "alice_key": self.alice_key,
             "raw_key": self.raw_key,
             "qber": round(self.qber * 100, 2)
         }
@@ -114,4 +312,4 @@ if __name__ == "__main__":
     print(f"Eavesdropper Present: {result['eavesdropper']}")
     print(f"QBER: {result['qber']}%")
     print(f"Matching Positions: {result['matching_indices']}")
-    print(f"Final Shared Key: {''.join(map(str, result['raw_key']))}")
+    print(f"Final Shared Key: {result['raw_key']}")
@@ -0,0 +1,127 @@
+import argparse
+import csv
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from reconciliation import cascade_reconciliation
+from simulator import BB84Simulator
+from toeplitz import secure_key_length
+
+# z-score of the two-sided 95% confidence interval
+CI_Z = 1.96
+
+PARAMETERS = ("num_qubits", "eavesdropper", "intercept_prob", "channel_noise")
+
+
+def parameter_grid(num_qubits=(1000,), eavesdropper=(False, True), intercept_prob=(1.0,), channel_noise=(0.0,)):
+    """
+    Cartesian product of the parameter values as a list of dicts.
+    Points without an eavesdropper ignore intercept_prob, so only one copy is kept.
+    """
+    points = dict.fromkeys(
+        (n, eve, p if eve else 0.0, noise)
+        for n, eve, p, noise in itertools.product(num_qubits, eavesdropper, intercept_prob, channel_noise)
+    )
+    return [dict(zip(PARAMETERS, point)) for point in points]
+
+
+def run_point(task):
+    """
+    Simulate one (grid point, repeat) task and return its QBER and key lengths.
+    """
+    point, seed = task
+    sim = BB84Simulator(
+        num_qubits=point["num_qubits"],
+        eavesdropper=point["eavesdropper"],
+        intercept_prob=point["intercept_prob"],
+        noise=point["channel_noise"],
+        seed=seed
+    )
+    sim.run()
+
+    sifted = len(sim.raw_key)
+    final_length = 0
+    if sifted:
+        _, stats = cascade_reconciliation(sim.alice_key, sim.raw_key, sim.qber, seed=seed)
+        final_length = secure_key_length(sifted, sim.qber, stats["leaked_bits"])
+
+    return sim.qber, sifted, final_length
+
+
+def run_sweep(grid, repeats=10, base_seed=0, workers=None):
+    """
+    Run every grid point `repeats` times over a process pool.
+
+    Each task gets its own child of SeedSequence(base_seed), spawned in task order,
+    so results are reproducible and independent of the number of workers.
+    Returns a columnar table (dict of numpy arrays) with one row per grid point.
+    """
+    workers = workers or os.cpu_count()
+    children = np.random.SeedSequence(base_seed).spawn(len(grid) * repeats)
+    seeds = [int(child.generate_state(1, dtype=np.uint64)[0]) for child in children]
+    tasks = [(point, seeds[i * repeats + r]) for i, point in enumerate(grid) for r in range(repeats)]
+
+    chunksize = max(1, len(tasks) // (workers * 8))
+    if workers == 1:
+        outcomes = list(map(run_point, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(run_point, tasks, chunksize=chunksize))
+
+    samples = np.array(outcomes, dtype=np.float64).reshape(len(grid), repeats, 3)
+    return aggregate(grid, samples)
+
+
+def aggregate(grid, samples):
+    """
+    Mean and 95% confidence half-width of QBER, sifted and final key length per grid point.
+    """
+    repeats = samples.shape[1]
+    table = {name: np.array([point[name] for point in grid]) for name in PARAMETERS}
+    table["repeats"] = np.full(len(grid), repeats)
+
+    for index, name in enumerate(("qber", "sifted_length", "key_length")):
+        values = samples[:, :, index]
+        std = values.std(axis=1, ddof=1) if repeats > 1 else np.zeros(len(grid))
+        table[f"{name}_mean"] = values.mean(axis=1)
+        table[f"{name}_ci"] = CI_Z * std / math.sqrt(repeats)
+
+    return table
+
+
+def save_table(table, filepath):
+    with open(filepath, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(table.keys())
+        writer.writerows(zip(*(column.tolist() for column in table.values())))
+    print(f"Saved {len(next(iter(table.values())))} sweep rows to: {filepath}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo BB84 parameter sweep")
+    parser.add_argument("--qubits", type=int, nargs="+", default=[10000])
+    parser.add_argument("--intercept", type=float, nargs="+", default=[0.0, 0.25, 0.5, 1.0])
+    parser.add_argument("--noise", type=float, nargs="+", default=[0.0, 0.02, 0.05])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="sweep_results.csv")
+    parser.add_argument("--plot", action="store_true", help="Plot key length vs QBER")
+    args = parser.parse_args()
+
+    grid = parameter_grid(args.qubits, (False, True), args.intercept, args.noise)
+
+    start = time.perf_counter()
+    table = run_sweep(grid, args.repeats, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Ran {len(grid) * args.repeats} simulations in {elapsed:.2f}s")
+
+    save_table(table, args.output)
+
+    if args.plot:
+        from visualization import plot_qber_vs_key_length
+        plot_qber_vs_key_length(table["qber_mean"] * 100, table["key_length_mean"], table["eavesdropper"])
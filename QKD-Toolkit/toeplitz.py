@@ -0,0 +1,63 @@
+import math
+import numpy as np
+from bitkey import BitKey
+from reconciliation import binary_entropy
+
+DEFAULT_EPSILON = 1e-10
+
+
+def secure_key_length(key_length, qber, leaked_bits, epsilon=DEFAULT_EPSILON):
+    """
+    Leftover-hash-lemma estimate of the extractable secret key length:
+    n * (1 - h(QBER)) - leaked reconciliation bits - 2 * log2(1 / epsilon).
+    """
+    length = key_length * (1 - binary_entropy(qber)) - leaked_bits - 2 * math.log2(1 / epsilon)
+    return max(0, math.floor(length))
+
+
+def toeplitz_seed(key_length, output_length, seed=None):
+    """
+    Public random bits that define an output_length x key_length Toeplitz matrix.
+    """
+    rng = np.random.default_rng(seed)
+    length = key_length + output_length - 1
+    return np.unpackbits(np.frombuffer(rng.bytes((length + 7) // 8), dtype=np.uint8), count=length)
+
+
+def fft_size(length):
+    """
+    Smallest 2^a * 3^b * 5^c >= length, which numpy's FFT handles efficiently.
+    """
+    best = 1 << max(length - 1, 0).bit_length()
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            size = power35
+            while size < length:
+                size *= 2
+            best = min(best, size)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def toeplitz_hash(key, output_length, seed=None):
+    """
+    Multiply the key by a random binary Toeplitz matrix T (2-universal hashing).
+
+    With T[i, j] = s[i - j + n - 1], output bit i is the (i + n - 1)-th entry of the
+    convolution of the seed s with the key, taken mod 2, so the whole product is one
+    FFT convolution instead of an O(n * m) loop. Wrap-around of a circular
+    convolution of size >= n + m - 1 never reaches that output window.
+    """
+    key_bits = BitKey.from_bits(key).to_array()
+    n = len(key_bits)
+    if output_length <= 0 or n == 0:
+        return BitKey()
+
+    seed_bits = toeplitz_seed(n, output_length, seed)
+    size = fft_size(len(seed_bits))
+    product = np.fft.irfft(np.fft.rfft(seed_bits, size) * np.fft.rfft(key_bits, size), size)
+    window = product[n - 1:n - 1 + output_length]
+    return BitKey.from_bits(np.rint(window).astype(np.int64) & 1)
@@ -3,6 +3,94 @@ import seaborn as sns
 import numpy as np
 from simulator import BB84Simulator
 
+# Upper bounds on drawn elements, so plotting cost stays flat as qubit counts grow
+MAX_RATE_BINS = 500
+MAX_RASTER_COLUMNS = 200
+MAX_RASTER_ROWS = 50
+
+
+def window_means(values, width, padded_length):
+    """
+    Mean of consecutive windows of `width` values, padding up to `padded_length`.
+    Windows that lie entirely in the padding come out as NaN.
+    """
+    sums = np.zeros(padded_length)
+    counts = np.zeros(padded_length)
+    sums[:len(values)] = values
+    counts[:len(values)] = 1
+    sums = sums.reshape(-1, width).sum(axis=1)
+    counts = counts.reshape(-1, width).sum(axis=1)
+    return np.divide(sums, counts, out=np.full(len(sums), np.nan), where=counts > 0)
+
+
+def binned_match_rate(sift_mask, bins=MAX_RATE_BINS):
+    """
+    Fraction of matching bases in consecutive windows of qubits.
+    Returns (window centers, match rates) with at most `bins` points.
+    """
+    mask = np.asarray(sift_mask, dtype=np.float64)
+    total = len(mask)
+    if total == 0:
+        return np.zeros(0), np.zeros(0)
+
+    width = -(-total // min(bins, total))
+    rates = window_means(mask, width, -(-total // width) * width)
+    centers = np.arange(len(rates)) * width + (width - 1) / 2
+    return centers, rates
+
+
+def mask_raster(sift_mask, columns=MAX_RASTER_COLUMNS, max_rows=MAX_RASTER_ROWS):
+    """
+    Reshape the mask into a (rows, columns) image in qubit order. Masks larger than
+    the image are averaged over groups of consecutive qubits per pixel.
+    Returns (image, qubits per pixel).
+    """
+    mask = np.asarray(sift_mask, dtype=np.float64)
+    total = len(mask)
+    pixels = max(1, min(total, columns * max_rows))
+    per_pixel = -(-total // pixels) if total else 1
+
+    row_length = per_pixel * columns
+    image = window_means(mask, per_pixel, -(-max(total, 1) // row_length) * row_length)
+    return image.reshape(-1, columns), per_pixel
+
+
+def draw_match_rate(ax, sift_mask):
+    centers, rates = binned_match_rate(sift_mask)
+    ax.step(centers, rates, where='mid', color='steelblue')
+    ax.fill_between(centers, rates, step='mid', color='skyblue', alpha=0.5)
+    ax.axhline(0.5, color='gray', linestyle='--', linewidth=1)
+    ax.set_ylim(0, 1)
+    ax.set_xlabel("Qubit Index")
+    ax.set_ylabel("Match Rate")
+
+
+def draw_mask_raster(ax, sift_mask):
+    image, per_pixel = mask_raster(sift_mask)
+    ax.imshow(image, cmap='coolwarm', vmin=0, vmax=1, aspect='auto', interpolation='nearest')
+    ax.set_xlabel(f"Qubit Index (mod {image.shape[1] * per_pixel})")
+    ax.set_ylabel("Row")
+    if per_pixel > 1:
+        ax.set_title(f"{per_pixel} qubits per pixel", fontsize=8, loc='right')
+
+
+def bit_agreement(alice_bits, bob_results, matching_indices):
+    """
+    1.0 where Bob's result equals Alice's bit, for every matching-basis position.
+    """
+    indices = np.asarray(matching_indices, dtype=np.int64)
+    return (np.asarray(alice_bits)[indices] == np.asarray(bob_results)[indices]).astype(np.float64)
+
+
+def draw_bit_agreement(ax, alice_bits, bob_results, matching_indices):
+    image, per_pixel = mask_raster(bit_agreement(alice_bits, bob_results, matching_indices))
+    im = ax.imshow(image, cmap='Greens', vmin=0, vmax=1, aspect='auto', interpolation='nearest')
+    ax.figure.colorbar(im, ax=ax)
+    ax.set_xlabel(f"Matching Index (mod {image.shape[1] * per_pixel})")
+    ax.set_yticks([])
+    if per_pixel > 1:
+        ax.set_title(f"{per_pixel} bits per pixel", fontsize=8, loc='right')
+
 
 def plot_qber_comparison(qber_with_eve, qber_without_eve):
     labels = ['With Eve', 'Without Eve']
@@ -18,43 +106,26 @@ def plot_qber_comparison(qber_with_eve, qber_without_eve):
     plt.show()
 
 
-def plot_basis_comparison(alice_bases, bob_bases):
-    match = [1 if a == b else 0 for a, b in zip(alice_bases, bob_bases)]
-    indices = np.arange(len(alice_bases))
-
-    plt.figure(figsize=(10, 3))
-    plt.scatter(indices, match, c=match, cmap='coolwarm', marker='|', s=100)
-    plt.title("Alice vs Bob Basis Match")
-    plt.xlabel("Qubit Index")
-    plt.ylabel("Match (1=True, 0=False)")
-    plt.yticks([0, 1])
-    plt.grid(axis='y', linestyle='--', alpha=0.6)
+def plot_basis_comparison(sift_mask):
+    fig, ax = plt.subplots(figsize=(10, 3))
+    draw_mask_raster(ax, sift_mask)
+    ax.set_title("Alice vs Bob Basis Match (red = match)", loc='left')
     plt.tight_layout()
     plt.show()
 
 
 def plot_bit_agreement(alice_bits, bob_results, matching_indices):
-    agreements = [1 if alice_bits[i] == bob_results[i] else 0 for i in matching_indices]
-    indices = np.arange(len(agreements))
-
-    plt.figure(figsize=(10, 3))
-    sns.heatmap([agreements], cmap='Greens', cbar=True, xticklabels=indices)
-    plt.title("Bit Agreement in Matching Bases (Alice vs Bob)")
-    plt.xlabel("Matching Index")
-    plt.yticks([])
+    fig, ax = plt.subplots(figsize=(10, 3))
+    draw_bit_agreement(ax, alice_bits, bob_results, matching_indices)
+    ax.set_title("Bit Agreement in Matching Bases (Alice vs Bob)", loc='left')
     plt.tight_layout()
     plt.show()
 
 
-def plot_matching_index_distribution(matching_indices, total_qubits):
-    data = [1 if i in matching_indices else 0 for i in range(total_qubits)]
-
-    plt.figure(figsize=(10, 2))
-    plt.bar(range(total_qubits), data, color='skyblue')
-    plt.title("Basis Matching Distribution")
-    plt.xlabel("Qubit Index")
-    plt.ylabel("Match")
-    plt.yticks([0, 1])
+def plot_matching_index_distribution(sift_mask):
+    fig, ax = plt.subplots(figsize=(10, 2))
+    draw_match_rate(ax, sift_mask)
+    ax.set_title("Basis Matching Distribution")
     plt.tight_layout()
     plt.show()
 
@@ -90,13 +161,13 @@ if __name__ == "__main__":
     plot_qber_comparison(res_eve['qber'], res_no_eve['qber'])
 
     # Basis match
-    plot_basis_comparison(res_eve['alice_bases'], res_eve['bob_bases'])
+    plot_basis_comparison(res_eve['sift_mask'])
 
     # Bit agreement heatmap
     plot_bit_agreement(res_eve['alice_bits'], res_eve['bob_results'], res_eve['matching_indices'])
 
     # Matching index distribution
-    plot_matching_index_distribution(res_eve['matching_indices'], res_eve['num_qubits'])
+    plot_matching_index_distribution(res_eve['sift_mask'])
 
     # For multi-run QBER vs key length plot:
     qbers = [res_eve['qber'], res_no_eve['qber']]
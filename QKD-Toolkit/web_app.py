@@ -1,10 +1,10 @@
 # app.py
 import streamlit as st
-from simulator import BB84Simulator
 from post_processing import apply_post_processing
+from sim_cache import cached_summary
+from visualization import draw_bit_agreement, draw_mask_raster, draw_match_rate
 import matplotlib.pyplot as plt
 import seaborn as sns
-import numpy as np
 
 st.set_page_config(page_title="Quantum Cryptography Toolkit", layout="wide")
 st.title("🔐 Quantum Cryptography Toolkit – BB84 Protocol Simulator")
@@ -13,6 +13,7 @@ st.title("🔐 Quantum Cryptography Toolkit – BB84 Protocol Simulator")
 st.sidebar.header("Simulation Settings")
 num_qubits = st.sidebar.slider("Number of Qubits", min_value=10, max_value=500, value=100, step=10)
 eavesdropper = st.sidebar.checkbox("Include Eavesdropper (Eve)", value=False)
+seed = int(st.sidebar.number_input("Seed", value=42, step=1))
 run_button = st.sidebar.button("▶ Run Simulation")
 
 if "sim_result" not in st.session_state:
@@ -20,9 +21,7 @@ if "sim_result" not in st.session_state:
     st.session_state.final_key = None
 
 if run_button:
-    sim = BB84Simulator(num_qubits=num_qubits, eavesdropper=eavesdropper)
-    sim.run()
-    st.session_state.sim_result = sim.summary()
+    st.session_state.sim_result = cached_summary(num_qubits, eavesdropper, seed)
     st.session_state.final_key = None
     st.success("Simulation completed!")
 
@@ -32,18 +31,17 @@ if st.session_state.sim_result:
     st.write(f"**Qubits Sent:** {res['num_qubits']}")
     st.write(f"**Eavesdropper Present:** {res['eavesdropper']}")
     st.write(f"**QBER:** {res['qber']}%")
-    st.write(f"**Raw Key:** `{''.join(map(str, res['raw_key']))}`")
+    st.write(f"**Raw Key:** `{res['raw_key']}`")
 
     with st.expander("📊 Visualizations", expanded=True):
         tabs = st.tabs(["QBER Comparison", "Basis Match", "Bit Agreement", "Match Index"])
 
         with tabs[0]:
-            sim_eve = BB84Simulator(num_qubits, eavesdropper=True)
-            sim_eve.run()
-            sim_no_eve = BB84Simulator(num_qubits, eavesdropper=False)
-            sim_no_eve.run()
+            # Served from the shared simulation cache, so reruns don't re-simulate
+            res_eve = cached_summary(num_qubits, True, seed)
+            res_no_eve = cached_summary(num_qubits, False, seed)
 
-            values = [sim_eve.qber * 100, sim_no_eve.qber * 100]
+            values = [res_eve["qber"], res_no_eve["qber"]]
             labels = ["With Eve", "Without Eve"]
 
             fig, ax = plt.subplots()
@@ -55,53 +53,38 @@ if st.session_state.sim_result:
             st.pyplot(fig)
 
         with tabs[1]:
-            alice_bases = res["alice_bases"]
-            bob_bases = res["bob_bases"]
-            match = [1 if a == b else 0 for a, b in zip(alice_bases, bob_bases)]
-            indices = np.arange(len(alice_bases))
-
             fig, ax = plt.subplots()
-            ax.scatter(indices, match, c=match, cmap='coolwarm', marker='|', s=100)
-            ax.set_title("Alice vs Bob Basis Match")
-            ax.set_xlabel("Qubit Index")
-            ax.set_ylabel("Match")
-            ax.set_yticks([0, 1])
-            ax.grid(True, linestyle='--', alpha=0.6)
+            draw_mask_raster(ax, res["sift_mask"])
+            ax.set_title("Alice vs Bob Basis Match (red = match)", loc='left')
             st.pyplot(fig)
 
         with tabs[2]:
-            agreements = [
-                1 if res["alice_bits"][i] == res["bob_results"][i] else 0
-                for i in res["matching_indices"]
-            ]
             fig, ax = plt.subplots(figsize=(10, 1.5))
-            sns.heatmap([agreements], cmap='Greens', cbar=True, xticklabels=False, ax=ax)
-            ax.set_title("Bit Agreement in Matching Bases")
-            ax.set_yticks([])
+            draw_bit_agreement(ax, res["alice_bits"], res["bob_results"], res["matching_indices"])
+            ax.set_title("Bit Agreement in Matching Bases", loc='left')
             st.pyplot(fig)
 
         with tabs[3]:
-            total = res["num_qubits"]
-            match_index = [1 if i in res["matching_indices"] else 0 for i in range(total)]
-
             fig, ax = plt.subplots()
-            ax.bar(range(total), match_index, color="skyblue")
+            draw_match_rate(ax, res["sift_mask"])
             ax.set_title("Matching Index Distribution")
-            ax.set_xlabel("Qubit Index")
-            ax.set_ylabel("Match")
-            ax.set_yticks([0, 1])
             st.pyplot(fig)
 
     st.subheader("🔐 Post-Processing")
     if st.button("Run Reconciliation + Privacy Amplification"):
-        alice_key = [res["alice_bits"][i] for i in res["matching_indices"]]
+        alice_key = res["alice_key"]
         bob_key = res["raw_key"]
-        st.session_state.final_key = apply_post_processing(alice_key, bob_key)
+        st.session_state.final_key = apply_post_processing(alice_key, bob_key, seed=seed)
         st.success("Post-processing complete!")
 
-    if st.session_state.final_key:
-        key_str = "".join(map(str, st.session_state.final_key))
+    if st.session_state.final_key is not None and not len(st.session_state.final_key):
+        st.warning("No secure key extractable: the QBER and reconciliation leakage use up the whole key. "
+                   "Send more qubits or remove the eavesdropper.")
+    elif st.session_state.final_key is not None:
+        final_key = st.session_state.final_key
+        key_str = str(final_key)
         st.code(key_str, language="plaintext")
         st.download_button("💾 Download Final Key", key_str, file_name="final_key.txt")
+        st.download_button("💾 Download Final Key (binary)", final_key.to_bytes(), file_name="final_key.bin")
 else:
     st.info("Run a simulation to view results.")
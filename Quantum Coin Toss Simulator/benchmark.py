@@ -0,0 +1,150 @@
+import argparse
+import csv
+import json
+import math
+import random
+import time
+import tracemalloc
+
+import numpy as np
+from c_toss import classical_coin_toss
+from q_toss import quantum_coin_toss
+
+# Tosses drawn per call in the chunked `integers` path, which bounds its memory
+CHUNK_TRIALS = 10_000_000
+
+
+def loop_toss(trials, seed=None):
+    """
+    The original per-trial random.randint loop, kept as the baseline.
+    """
+    rng = random.Random(seed)
+    results = {"0": 0, "1": 0}
+    for _ in range(trials):
+        results[str(rng.randint(0, 1))] += 1
+    return results
+
+
+def integers_toss(trials, seed=None):
+    """
+    Every toss drawn with Generator.integers, in chunks of CHUNK_TRIALS.
+    """
+    rng = np.random.default_rng(seed)
+    tails = 0
+    for start in range(0, trials, CHUNK_TRIALS):
+        tails += int(np.count_nonzero(rng.integers(0, 2, min(CHUNK_TRIALS, trials - start), dtype=np.uint8)))
+    return {"0": trials - tails, "1": tails}
+
+
+def aer_toss(trials, seed=None):
+    """
+    Quantum toss through the full Aer simulator, bypassing the fast-path sampler.
+    """
+    from qiskit import QuantumCircuit
+    from qiskit_aer import Aer
+
+    qc = QuantumCircuit(1, 1)
+    qc.h(0)
+    qc.measure(0, 0)
+    result = Aer.get_backend('qasm_simulator').run(qc, shots=trials, seed_simulator=seed).result()
+    counts = result.get_counts()
+    return {"0": counts.get("0", 0), "1": counts.get("1", 0)}
+
+
+# name -> (toss function, largest trial count worth timing)
+PATHS = {
+    "classical_loop": (loop_toss, 10**6),
+    "classical_integers": (integers_toss, 10**9),
+    "classical_binomial": (lambda trials, seed: classical_coin_toss(trials, show_plot=False, seed=seed), 10**9),
+    "quantum_aer": (aer_toss, 10**6),
+    "quantum_fast": (lambda trials, seed: quantum_coin_toss(trials, show_plot=False, seed=seed), 10**9)
+}
+
+
+def chi_squared_uniformity(counts):
+    """
+    Chi-squared statistic of heads/tails counts against a fair coin and its p-value (1 degree of freedom).
+    """
+    trials = counts["0"] + counts["1"]
+    expected = trials / 2
+    chi2 = ((counts["0"] - expected) ** 2 + (counts["1"] - expected) ** 2) / expected
+    return chi2, math.erfc(math.sqrt(chi2 / 2))
+
+
+def benchmark_path(name, trials, repeats=5, seed=0):
+    """
+    Latency percentiles, throughput, peak traced memory and uniformity of one path.
+    """
+    toss, _ = PATHS[name]
+    latencies = []
+    for r in range(repeats):
+        start = time.perf_counter()
+        counts = toss(trials, seed + r)
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    toss(trials, seed)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    chi2, p_value = chi_squared_uniformity(counts)
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        "path": name,
+        "trials": trials,
+        "repeats": repeats,
+        "throughput_per_s": trials / p50,
+        "latency_p50_s": p50,
+        "latency_p90_s": p90,
+        "latency_p99_s": p99,
+        "peak_memory_bytes": peak,
+        "heads": counts["0"],
+        "tails": counts["1"],
+        "chi_squared": chi2,
+        "p_value": p_value
+    }
+
+
+def run_benchmark(paths=tuple(PATHS), max_exponent=9, repeats=5, seed=0):
+    """
+    Benchmark every path at 10^3 .. 10^max_exponent trials, skipping counts above the path's limit.
+    """
+    rows = []
+    for name in paths:
+        limit = PATHS[name][1]
+        for exponent in range(3, max_exponent + 1):
+            if 10 ** exponent > limit:
+                break
+            row = benchmark_path(name, 10 ** exponent, repeats, seed)
+            print(f"{name:<20} 10^{exponent:<2} {row['throughput_per_s']:>16,.0f} tosses/s  "
+                  f"p50 {row['latency_p50_s'] * 1e3:>10.3f} ms  peak {row['peak_memory_bytes'] / 1024:>10.1f} KiB  "
+                  f"chi2 p={row['p_value']:.3f}")
+            rows.append(row)
+    return rows
+
+
+def save_report(rows, json_path=None, csv_path=None):
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Saved benchmark report to: {json_path}")
+    if csv_path and rows:
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Saved benchmark report to: {csv_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark classical and quantum coin tosses")
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS))
+    parser.add_argument("--max-exponent", type=int, default=9, help="Largest trial count as a power of 10")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default="coin_toss_benchmark.json")
+    parser.add_argument("--csv", default="coin_toss_benchmark.csv")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.paths, args.max_exponent, args.repeats, args.seed)
+    save_report(rows, args.json, args.csv)
@@ -1,19 +1,18 @@
-import random
+import numpy as np
 import matplotlib.pyplot as plt
 
-def classical_coin_toss(trials=1000):
-    results = {"0": 0, "1": 0}
-    for _ in range(trials):
-        toss = str(random.randint(0, 1))
-        results[toss] += 1
+def classical_coin_toss(trials=1000, show_plot=True, seed=None):
+    # One binomial draw gives the number of tails without generating every toss
+    tails = int(np.random.default_rng(seed).binomial(trials, 0.5))
+    results = {"0": trials - tails, "1": tails}
 
-    # Plotting
-    labels = ['Heads (0)', 'Tails (1)']
-    values = [results['0'], results['1']]
-    plt.bar(labels, values, color=['green', 'orange'])
-    plt.title(f"Classical Coin Toss - {trials} Trials")
-    plt.ylabel("Frequency")
-    plt.show()
+    if show_plot:
+        labels = ['Heads (0)', 'Tails (1)']
+        values = [results['0'], results['1']]
+        plt.bar(labels, values, color=['green', 'orange'])
+        plt.title(f"Classical Coin Toss - {trials} Trials")
+        plt.ylabel("Frequency")
+        plt.show()
 
     return results
 
@@ -0,0 +1 @@
+../Quantum Random Number Generator (QRNG)/fast_sampler.py
\ No newline at end of file
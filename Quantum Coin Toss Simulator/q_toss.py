@@ -1,26 +1,25 @@
 from qiskit import QuantumCircuit
-from qiskit_aer import Aer
 import matplotlib.pyplot as plt
+from fast_sampler import run_circuit
 
-def quantum_coin_toss(shots=1000):
+def quantum_coin_toss(shots=1000, show_plot=True, seed=None):
     # Step 1: Build circuit
     qc = QuantumCircuit(1, 1)
     qc.h(0)               # Apply Hadamard gate
     qc.measure(0, 0)      # Measure qubit
 
-    # Step 2: Simulate
-    backend = Aer.get_backend('qasm_simulator')
-    job = backend.run(qc, shots=shots)
-    result = job.result()
+    # Step 2: Simulate (sampled directly, since the circuit is a single H + measure)
+    result = run_circuit(qc, shots=shots, seed=seed)
     counts = result.get_counts()
 
     # Step 3: Plot
-    labels = ['Heads (0)', 'Tails (1)']
-    values = [counts.get('0', 0), counts.get('1', 0)]
-    plt.bar(labels, values, color=['skyblue', 'salmon'])
-    plt.title(f"Quantum Coin Toss - {shots} Trials")
-    plt.ylabel("Frequency")
-    plt.show()
+    if show_plot:
+        labels = ['Heads (0)', 'Tails (1)']
+        values = [counts.get('0', 0), counts.get('1', 0)]
+        plt.bar(labels, values, color=['skyblue', 'salmon'])
+        plt.title(f"Quantum Coin Toss - {shots} Trials")
+        plt.ylabel("Frequency")
+        plt.show()
 
     return counts
 
@@ -0,0 +1,191 @@
+import argparse
+import hashlib
+import math
+import time
+
+import numpy as np
+
+DEFAULT_EPSILON = 1e-10
+
+
+class Extractor:
+    """
+    Streaming randomness extractor. process() takes packed uint8 chunks of raw
+    bits and returns packed conditioned bytes; input that does not fill a whole
+    block is carried over to the next call.
+    """
+
+    name = "identity"
+
+    def __init__(self):
+        self.bits_in = 0
+        self.bits_out = 0
+        self.pending = np.zeros(0, dtype=np.uint8)
+
+    def process(self, packed):
+        packed = np.asarray(packed, dtype=np.uint8)
+        self.bits_in += 8 * len(packed)
+        out = self.extract(packed)
+        self.bits_out += 8 * len(out)
+        return out
+
+    def extract(self, packed):
+        return packed
+
+    def flush(self):
+        """
+        Drop input too short for a full block. Extractors never pad, since padded
+        output would not be uniformly random.
+        """
+        self.pending = np.zeros(0, dtype=np.uint8)
+        return np.zeros(0, dtype=np.uint8)
+
+    @property
+    def ratio(self):
+        """
+        Raw input bits consumed per output bit.
+        """
+        return self.bits_in / self.bits_out if self.bits_out else math.inf
+
+    def stats(self):
+        return {"extractor": self.name, "bits_in": self.bits_in, "bits_out": self.bits_out, "ratio": self.ratio}
+
+
+class VonNeumannExtractor(Extractor):
+    """
+    Maps bit pairs 01 -> 0 and 10 -> 1 and discards 00 and 11. Removes bias from
+    independent bits without knowing it, at a cost of at least 4 input bits per output bit.
+    """
+
+    name = "von_neumann"
+
+    def extract(self, packed):
+        pairs = np.unpackbits(packed).reshape(-1, 2)
+        bits = np.concatenate((self.pending, pairs[pairs[:, 0] != pairs[:, 1], 0]))
+        whole = len(bits) // 8 * 8
+        self.pending = bits[whole:]
+        return np.packbits(bits[:whole])
+
+
+class BlockExtractor(Extractor):
+    """
+    Extractor applied to fixed-size blocks of `block_bytes` input bytes.
+    """
+
+    def __init__(self, block_bytes):
+        super().__init__()
+        self.block_bytes = block_bytes
+
+    def extract(self, packed):
+        data = np.concatenate((self.pending, packed))
+        blocks = len(data) // self.block_bytes
+        self.pending = data[blocks * self.block_bytes:]
+        if not blocks:
+            return np.zeros(0, dtype=np.uint8)
+        return self.extract_blocks(data[:blocks * self.block_bytes].reshape(blocks, self.block_bytes))
+
+
+class ToeplitzExtractor(BlockExtractor):
+    """
+    Multiplies each block by a fixed random Toeplitz matrix over GF(2). The output
+    length follows the leftover hash lemma for the assumed min-entropy per raw bit.
+    The matrix seed is public but must be chosen independently of the source.
+    """
+
+    name = "toeplitz"
+
+    def __init__(self, block_bits=1 << 16, min_entropy=0.9, epsilon=DEFAULT_EPSILON, seed=0):
+        super().__init__(block_bits // 8)
+        n = self.block_bytes * 8
+        m = math.floor(n * min_entropy - 2 * math.log2(1 / epsilon)) // 8 * 8
+        if m <= 0:
+            raise ValueError("Block too small for the requested min-entropy and epsilon")
+        self.input_bits, self.output_bits = n, m
+
+        # Entry (i, j) of the matrix is diagonal[i - j + n - 1], so the product is
+        # a slice of the linear convolution of diagonal and the block.
+        diagonal = np.random.default_rng(seed).integers(0, 2, n + m - 1).astype(np.float64)
+        self.fft_length = 1 << (n + m - 2).bit_length()
+        self.seed_spectrum = np.fft.rfft(diagonal, self.fft_length)
+
+    def extract_blocks(self, blocks):
+        n, m = self.input_bits, self.output_bits
+        bits = np.unpackbits(blocks, axis=1).astype(np.float64)
+        product = np.fft.irfft(np.fft.rfft(bits, self.fft_length, axis=1) * self.seed_spectrum, self.fft_length, axis=1)
+        out = np.rint(product[:, n - 1:n - 1 + m]).astype(np.int64) & 1
+        return np.packbits(out.astype(np.uint8), axis=1).ravel()
+
+
+class SHA256Extractor(BlockExtractor):
+    """
+    Hashes each block of `block_bytes` raw bytes to 32 output bytes. Suitable when
+    the block holds comfortably more than 256 bits of min-entropy.
+    """
+
+    name = "sha256"
+
+    def __init__(self, block_bytes=64):
+        if block_bytes < 32:
+            raise ValueError("SHA-256 blocks must hold at least 32 bytes of input")
+        super().__init__(block_bytes)
+
+    def extract_blocks(self, blocks):
+        digests = b"".join(hashlib.sha256(block).digest() for block in blocks)
+        return np.frombuffer(digests, dtype=np.uint8)
+
+
+EXTRACTORS = {
+    VonNeumannExtractor.name: VonNeumannExtractor,
+    ToeplitzExtractor.name: ToeplitzExtractor,
+    SHA256Extractor.name: SHA256Extractor
+}
+
+
+def make_extractor(name, **kwargs):
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}', expected one of {', '.join(EXTRACTORS)}")
+    return EXTRACTORS[name](**kwargs)
+
+
+def extract_stream(chunks, extractor):
+    """
+    Pipeline stage: yield conditioned packed bytes for each packed input chunk.
+    """
+    for chunk in chunks:
+        out = extractor.process(chunk)
+        if len(out):
+            yield out
+    extractor.flush()
+
+
+def benchmark_extractors(n_bytes=1 << 22, chunk_bytes=1 << 16, seed=0):
+    """
+    Raw input throughput (bits/s) and input/output ratio of every extractor,
+    measured on `n_bytes` of pseudo-random input fed in `chunk_bytes` chunks.
+    """
+    data = np.random.default_rng(seed).integers(0, 256, n_bytes, dtype=np.uint8)
+    chunks = [data[i:i + chunk_bytes] for i in range(0, n_bytes, chunk_bytes)]
+
+    results = []
+    for name in EXTRACTORS:
+        extractor = make_extractor(name)
+        start = time.perf_counter()
+        for _ in extract_stream(chunks, extractor):
+            pass
+        elapsed = time.perf_counter() - start
+        results.append({**extractor.stats(), "input_bits_per_s": 8 * n_bytes / elapsed})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark QRNG randomness extractors")
+    parser.add_argument("--bytes", type=int, default=1 << 22, help="Raw input size")
+    parser.add_argument("--qrng", action="store_true", help="Also measure batched QRNG generation rate")
+    args = parser.parse_args()
+
+    for row in benchmark_extractors(args.bytes):
+        print(f"{row['extractor']:<12} {row['input_bits_per_s']:>16,.0f} raw bits/s   ratio {row['ratio']:.2f}:1")
+
+    if args.qrng:
+        from qrng_utils import measure_throughput
+        print(f"{'qrng':<12} {measure_throughput(4_000_000):>16,.0f} raw bits/s")
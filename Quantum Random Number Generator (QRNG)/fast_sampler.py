@@ -0,0 +1,155 @@
+from collections import Counter
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.circuit import Gate
+from qiskit_aer import Aer
+
+# Operations that do not change the state of a qubit
+IGNORED_OPERATIONS = {"barrier", "delay"}
+
+# Outcome probabilities this close to 1/2 are sampled from raw random bytes
+UNIFORM_TOLERANCE = 1e-12
+
+# Counts-only runs on at most this many classical bits draw one multinomial sample
+MAX_MULTINOMIAL_CLBITS = 16
+
+# Noiseless simulators, whose results the fast path reproduces exactly
+IDEAL_BACKENDS = {"qasm_simulator", "aer_simulator", "aer_simulator_statevector"}
+
+
+def measurement_probabilities(qc: QuantumCircuit):
+    """
+    Probability that each classical bit reads 1, if the circuit only applies
+    single-qubit gates to |0> before measuring each qubit at most once into its
+    own classical bit. Returns None for any other circuit.
+    """
+    if len(qc.cregs) != 1 or len(qc.clbits) == 0:
+        return None
+
+    states = np.zeros((qc.num_qubits, 2), dtype=complex)
+    states[:, 0] = 1
+    measured = set()
+    probabilities = np.zeros(qc.num_clbits)
+    written = set()
+
+    for instruction in qc.data:
+        op = instruction.operation
+        if op.name in IGNORED_OPERATIONS:
+            continue
+        qubits = [qc.find_bit(q).index for q in instruction.qubits]
+
+        if op.name == "measure":
+            qubit, clbit = qubits[0], qc.find_bit(instruction.clbits[0]).index
+            if qubit in measured or clbit in written:
+                return None  # repeated measurements are correlated
+            measured.add(qubit)
+            written.add(clbit)
+            probabilities[clbit] = abs(states[qubit, 1]) ** 2
+            continue
+
+        if not isinstance(op, Gate) or op.num_qubits != 1 or instruction.clbits or qubits[0] in measured:
+            return None
+        try:
+            matrix = op.to_matrix()
+        except Exception:
+            return None  # unbound parameters or gates without a matrix definition
+        states[qubits[0]] = matrix @ states[qubits[0]]
+
+    if not written:
+        return None
+    return np.clip(probabilities, 0.0, 1.0)
+
+
+def sample_bits(probabilities, shots, rng):
+    """
+    (shots, n_clbits) uint8 array of independent Bernoulli outcomes, columns in clbit order.
+    """
+    probabilities = np.asarray(probabilities)
+    if np.all(np.abs(probabilities - 0.5) < UNIFORM_TOLERANCE):
+        width = len(probabilities)
+        raw = rng.integers(0, 256, -(-shots * width // 8), dtype=np.uint8)
+        return np.unpackbits(raw, count=shots * width).reshape(shots, width)
+    return (rng.random((shots, len(probabilities))) < probabilities).astype(np.uint8)
+
+
+def outcome_values(bits):
+    """
+    Integer value of each row of a (shots, width) bit array, bit i being classical bit i.
+    """
+    width = bits.shape[1]
+    weights = 1 << np.arange(width, dtype=np.int64 if width < 63 else object)
+    return bits.astype(weights.dtype) @ weights
+
+
+def sample_counts(probabilities, shots, rng):
+    """
+    Outcome counts without drawing individual shots when the register is small.
+    Keys are integers whose bit i is classical bit i.
+    """
+    width = len(probabilities)
+    if width > MAX_MULTINOMIAL_CLBITS:
+        return Counter(outcome_values(sample_bits(probabilities, shots, rng)).tolist())
+
+    outcome_probs = np.ones(1)
+    for p in probabilities:
+        outcome_probs = np.concatenate((outcome_probs * (1 - p), outcome_probs * p))
+    counts = rng.multinomial(shots, outcome_probs / outcome_probs.sum())
+    return {int(value): int(counts[value]) for value in np.flatnonzero(counts)}
+
+
+class SampledResult:
+    """
+    Result of a fast-path run, with the get_counts()/get_memory() interface of an Aer result.
+    """
+
+    def __init__(self, width, shots, bits=None, counts=None):
+        self.width = width
+        self.shots = shots
+        self.bits = bits
+        self.counts = counts
+
+    def get_memory(self, experiment=None):
+        # experiment is accepted for compatibility with Aer's Result; there is only one
+        if self.bits is None:
+            raise ValueError("Memory was not requested for this run")
+        text = (self.bits[:, ::-1] + ord("0")).tobytes().decode()
+        return [text[i * self.width:(i + 1) * self.width] for i in range(self.shots)]
+
+    def get_counts(self, experiment=None):
+        if self.counts is None:
+            self.counts = Counter(outcome_values(self.bits).tolist())
+        return {format(value, f"0{self.width}b"): count for value, count in sorted(self.counts.items())}
+
+
+def ideal_backend(backend):
+    """
+    True if `backend` is absent or a known noiseless simulator without a noise model.
+    """
+    if backend is None:
+        return True
+    name = backend.name() if callable(backend.name) else backend.name
+    return name in IDEAL_BACKENDS and getattr(backend.options, "noise_model", None) is None
+
+
+def run_circuit(qc: QuantumCircuit, shots=1024, memory=False, seed=None, backend=None, **run_options):
+    """
+    Run a circuit, sampling product-state circuits directly and sending
+    everything else to `backend` (Aer's qasm_simulator by default) with
+    `run_options`. Only runs on an ideal backend without `run_options` (which
+    may add noise) take the direct path. Both paths return an object with
+    get_counts() and, if `memory` is set, get_memory() in Aer's format.
+    """
+    probabilities = None
+    if not run_options and ideal_backend(backend):
+        probabilities = measurement_probabilities(qc)
+    if probabilities is None:
+        backend = backend or Aer.get_backend("qasm_simulator")
+        if seed is not None:
+            run_options["seed_simulator"] = seed
+        return backend.run(qc, shots=shots, memory=memory, **run_options).result()
+
+    rng = np.random.default_rng(seed)
+    if memory:
+        return SampledResult(qc.num_clbits, shots, bits=sample_bits(probabilities, shots, rng))
+    return SampledResult(qc.num_clbits, shots, counts=sample_counts(probabilities, shots, rng))
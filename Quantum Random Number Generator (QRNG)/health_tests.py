@@ -0,0 +1,385 @@
+import argparse
+import math
+
+import numpy as np
+from qrng_format import MAGIC, CHUNK_BYTES, CHUNK_LINES, PackedFile
+
+# False positive probability of each continuous test (SP 800-90B recommends 2^-20 to 2^-40).
+# The tests run once per bit, so 2^-20 would alarm about once per Mbit on an ideal source
+DEFAULT_ALPHA = 2 ** -40
+
+# Adaptive proportion test window for binary sources (SP 800-90B, section 4.4.2)
+APT_WINDOW = 1024
+
+# Upper confidence bound z-score of the most-common-value estimate (99%)
+MCV_Z = 2.576
+
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# By default the runs and byte min-entropy estimates look at one 64-bit word in
+# every ESTIMATE_STRIDE; the repetition count and adaptive proportion tests see every bit
+ESTIMATE_STRIDE = 64
+
+
+def word_popcounts(words, out=None):
+    """
+    Set bits in each element of a uint64 array, as uint8.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words, out=out)
+    # numpy < 2.0 has no popcount ufunc
+    return POPCOUNT_TABLE[words.view(np.uint8)].reshape(len(words), 8).sum(axis=1, dtype=np.uint8, out=out)
+
+
+def block_dtype(cutoff):
+    """
+    Widest unsigned type whose aligned blocks every run of `cutoff` bits must cover.
+    A run of at least 2B - 1 bits always contains a whole aligned B-bit block, so
+    only all-0 or all-1 blocks can be part of a run at the cutoff.
+    """
+    for dtype in (np.uint64, np.uint32, np.uint16, np.uint8):
+        if 16 * np.dtype(dtype).itemsize - 1 <= cutoff:
+            return np.dtype(dtype)
+    return None
+
+
+class HealthTestFailure(RuntimeError):
+    """
+    Raised by a consumer of HealthMonitor to stop using a source after an alarm.
+    """
+
+
+def repetition_count_cutoff(min_entropy=1.0, alpha=DEFAULT_ALPHA):
+    """
+    Longest run of identical samples tolerated: 1 + ceil(-log2(alpha) / H).
+    """
+    return 1 + math.ceil(-math.log2(alpha) / min_entropy)
+
+
+def adaptive_proportion_cutoff(min_entropy=1.0, alpha=DEFAULT_ALPHA, window=APT_WINDOW):
+    """
+    Alarm threshold for how often the first sample of a window may recur in it:
+    1 + the smallest c with P(Binomial(window, 2^-H) <= c) >= 1 - alpha.
+    """
+    p = 2 ** -min_entropy
+    cdf = 0.0
+    for c in range(window + 1):
+        log_pmf = (math.lgamma(window + 1) - math.lgamma(c + 1) - math.lgamma(window - c + 1)
+                   + c * math.log(p) + (window - c) * math.log1p(-p))
+        cdf += math.exp(log_pmf)
+        if cdf >= 1 - alpha:
+            return min(window, 1 + c)
+    return window
+
+
+def most_common_value_entropy(counts):
+    """
+    SP 800-90B most-common-value min-entropy estimate (bits per sample) from a histogram.
+    """
+    total = int(np.sum(counts))
+    if total < 2:
+        return 0.0
+    p = int(np.max(counts)) / total
+    upper = min(1.0, p + MCV_Z * math.sqrt(p * (1 - p) / (total - 1)))
+    return -math.log2(upper) if upper < 1 else 0.0
+
+
+def leading_run(rows, values):
+    """
+    Number of leading bits of each packed row equal to the matching value.
+    """
+    differs = np.unpackbits(rows, axis=1) != values[:, None]
+    return np.where(differs.any(axis=1), differs.argmax(axis=1), differs.shape[1])
+
+
+def trailing_run(rows, values):
+    """
+    Number of trailing bits of each packed row equal to the matching value.
+    """
+    differs = np.unpackbits(rows, axis=1)[:, ::-1] != values[:, None]
+    return np.where(differs.any(axis=1), differs.argmax(axis=1), differs.shape[1])
+
+
+class HealthMonitor:
+    """
+    Continuous health tests over a stream of packed bits, in constant memory.
+
+    The repetition count and adaptive proportion tests see every bit and raise
+    alarms through `on_alarm(test, details)`, once per chunk with failures; a run
+    that continues over several chunks alarms once. Monobit, runs and min-entropy
+    are running estimates available from report(); the runs and byte estimates are
+    taken over a sample of the words. Feed raw (unconditioned) source bits.
+
+    Packed bytes are tested without unpacking them: runs at the repetition count
+    cutoff must cover a whole all-0 or all-1 block, so only those blocks and the
+    chunk edges are unpacked. longest_run is therefore only tracked for runs long
+    enough to cover such a block.
+    """
+
+    def __init__(self, min_entropy=1.0, alpha=DEFAULT_ALPHA, window=APT_WINDOW, on_alarm=None,
+                 estimate_stride=ESTIMATE_STRIDE):
+        if window % 64:
+            raise ValueError("The adaptive proportion window must be a whole number of 64-bit words")
+        self.rct_cutoff = repetition_count_cutoff(min_entropy, alpha)
+        self.apt_cutoff = adaptive_proportion_cutoff(min_entropy, alpha, window)
+        self.block = block_dtype(self.rct_cutoff)
+        self.window_bytes = window // 8
+        self.on_alarm = on_alarm
+        self.estimate_stride = estimate_stride
+
+        self.total_bits = 0
+        self.ones = 0
+        self.transitions = 0
+        self.pairs = 0
+        self.last_bit = None
+        self.run_length = 0
+        self.run_alarmed = False
+        self.longest_run = 0
+        self.windows = 0
+        self.max_proportion = 0
+        self.window_pending = np.zeros(0, dtype=np.uint8)
+        self.bit_pending = np.zeros(0, dtype=np.uint8)
+        self.byte_counts = np.zeros(256, dtype=np.int64)
+        self.word_offset = 0
+        self.alarms = {"repetition_count": 0, "adaptive_proportion": 0}
+        # Reused work arrays: freshly allocated chunk-sized arrays cost more in
+        # page faults than the arithmetic done on them
+        self.scratch = {}
+
+    def buffer(self, name, length, dtype):
+        array = self.scratch.get(name)
+        if array is None or len(array) < length:
+            array = self.scratch[name] = np.empty(length, dtype=dtype)
+        return array[:length]
+
+    def alarm(self, test, **details):
+        self.alarms[test] += 1
+        if self.on_alarm:
+            self.on_alarm(test, {"chunk_start": self.total_bits, **details})
+
+    def update(self, packed, n_bits=None):
+        """
+        Test the next packed chunk. `n_bits` trims padding from the final chunk of a stream.
+        """
+        packed = np.asarray(packed, dtype=np.uint8)
+        n_bits = 8 * len(packed) if n_bits is None else n_bits
+        if not n_bits:
+            return
+        whole = packed[:n_bits // 8]
+        # The body is tested 64 bits at a time; the few bits after it are unpacked
+        body = whole[:len(whole) // 8 * 8]
+        tail = np.unpackbits(packed[len(body):], count=n_bits - 8 * len(body))
+
+        counts = None
+        if len(body):
+            counts = word_popcounts(body.view(np.uint64), self.buffer("counts", len(body) // 8, np.uint8))
+            self.ones += int(counts.sum(dtype=np.uint32))
+            self.sample_words(body)
+        self.ones += int(tail.sum())
+        self.transitions += int(np.count_nonzero(tail[1:] != tail[:-1]))
+        self.pairs += max(len(tail) - 1, 0)
+
+        if self.block is None:
+            self.repetition_count(np.unpackbits(packed, count=n_bits))
+        else:
+            if len(body):
+                self.repetition_count_blocks(body)
+            if len(tail):
+                self.repetition_count(tail)
+        self.adaptive_proportion(whole, counts)
+        self.total_bits += n_bits
+
+    def update_bits(self, bits):
+        """
+        Test a flat 0/1 array, e.g. bits parsed from a text file. Bits that do not
+        fill a byte wait for the next call or finish().
+        """
+        bits = np.concatenate((self.bit_pending, np.asarray(bits, dtype=np.uint8)))
+        whole = len(bits) // 8 * 8
+        self.bit_pending = bits[whole:]
+        self.update(np.packbits(bits[:whole]))
+
+    def finish(self):
+        if len(self.bit_pending):
+            self.update(np.packbits(self.bit_pending), len(self.bit_pending))
+            self.bit_pending = np.zeros(0, dtype=np.uint8)
+        return self.report()
+
+    def sample_words(self, body):
+        """
+        Add every estimate_stride-th 64-bit word of the stream to the runs and byte estimates.
+        """
+        start = -self.word_offset % self.estimate_stride
+        self.word_offset += len(body) // 8
+        # Big-endian words keep the stream order: the first bit is the MSB
+        words = body.view(">u8")[start::self.estimate_stride].astype(np.uint64)
+        if not len(words):
+            return
+        # Bit i of changes is set where stream bits i and i - 1 (from the LSB) differ;
+        # bit 0 is the word's last bit itself and is taken off again
+        changes = words ^ (words << np.uint64(1))
+        self.transitions += int(word_popcounts(changes).sum(dtype=np.uint64)) - int((words & np.uint64(1)).sum())
+        self.pairs += 63 * len(words)
+        self.byte_counts += np.bincount(words.view(np.uint8), minlength=256)
+
+    def repetition_count(self, bits):
+        """
+        Repetition count test on unpacked bits.
+        """
+        starts = np.flatnonzero(bits[1:] != bits[:-1]) + 1
+        lengths = np.diff(np.concatenate(([0], starts, [len(bits)])))
+        continues = self.last_bit is not None and bits[0] == self.last_bit
+        if continues:
+            lengths[0] += self.run_length
+        self.check_runs(lengths, continues, int(bits[-1]))
+
+    def repetition_count_blocks(self, body):
+        """
+        Repetition count test on whole words. Runs at the cutoff cover whole all-0 or
+        all-1 blocks, so only the neighbours of those blocks and the chunk ends are unpacked.
+        """
+        width = 8 * self.block.itemsize
+        rows = body.reshape(-1, self.block.itemsize)
+        first_bit, last_bit = int(body[0]) >> 7, int(body[-1]) & 1
+        continues = self.last_bit is not None and first_bit == self.last_bit
+        carried = self.run_length if continues else 0
+
+        # All-0 blocks become 1 and all-1 blocks wrap around to 0
+        blocks = np.add(body.view(self.block), self.block.type(1), out=self.buffer("blocks", len(rows), self.block))
+        uniform = np.flatnonzero(np.less_equal(blocks, 1, out=self.buffer("uniform", len(rows), bool)))
+
+        # Groups of consecutive uniform blocks with the same value
+        values = rows[uniform, 0] >> 7
+        breaks = (np.diff(uniform) != 1) | (np.diff(values) != 0)
+        opens = np.concatenate(([True], breaks))[:len(uniform)]
+        closes = np.concatenate((breaks, [True]))[:len(uniform)]
+        starts, ends, values = uniform[opens], uniform[closes], values[opens]
+
+        # Each group's run also takes the matching bits next to it: the previous
+        # chunk's run before block 0, nothing after the last block (still ongoing)
+        before = np.maximum(starts - 1, 0)
+        after = np.minimum(ends + 1, len(rows) - 1)
+        left = np.where(starts > 0, trailing_run(rows[before], values), carried * (values == first_bit))
+        right = np.where(ends < len(rows) - 1, leading_run(rows[after], values), 0)
+        lengths = left + width * (ends - starts + 1) + right
+
+        if not len(starts) or starts[0]:
+            lead = leading_run(rows[:1], np.array([first_bit], dtype=np.uint8))
+            lengths = np.concatenate((lead + carried, lengths))
+        if not len(ends) or ends[-1] < len(rows) - 1:
+            lengths = np.concatenate((lengths, trailing_run(rows[-1:], np.array([last_bit], dtype=np.uint8))))
+        self.check_runs(lengths, continues, last_bit)
+
+    def check_runs(self, lengths, continues, last_bit):
+        """
+        Alarm on runs at the cutoff. `lengths` starts with the run holding the chunk's
+        first bit (including the previous chunk's part if it `continues`) and ends
+        with the run holding its last bit, which the next chunk may extend.
+        """
+        self.longest_run = max(self.longest_run, int(lengths.max()))
+        failed = lengths >= self.rct_cutoff
+        if continues and self.run_alarmed:
+            failed[0] = False   # already reported while it was still running
+        if failed.any():
+            self.alarm("repetition_count", runs=int(failed.sum()), run_length=int(lengths[failed].max()),
+                       cutoff=self.rct_cutoff)
+        self.last_bit = last_bit
+        self.run_length = int(lengths[-1])
+        self.run_alarmed = self.run_length >= self.rct_cutoff
+
+    def adaptive_proportion(self, packed, counts=None):
+        """
+        Adaptive proportion test over the windows completed by `packed`. `counts`
+        are the popcounts of its leading 64-bit words, reused when the windows line up with them.
+        """
+        data = np.concatenate((self.window_pending, packed)) if len(self.window_pending) else packed
+        windows = len(data) // self.window_bytes
+        self.window_pending = data[windows * self.window_bytes:].copy()
+        if not windows:
+            return
+
+        blocks = data[:windows * self.window_bytes]
+        if counts is None or data is not packed:
+            counts = word_popcounts(blocks.view("<u8"))
+        # A matrix product sums the rows several times faster than sum(axis=1)
+        ones = counts[:len(blocks) // 8].reshape(windows, -1) @ np.ones(self.window_bytes // 8, dtype=np.float32)
+        first_is_one = blocks[::self.window_bytes] >= 0x80
+        matches = np.where(first_is_one, ones, 8 * self.window_bytes - ones)
+        self.windows += windows
+        worst = int(matches.max())
+        self.max_proportion = max(self.max_proportion, worst)
+
+        if worst >= self.apt_cutoff:
+            self.alarm("adaptive_proportion", count=worst, cutoff=self.apt_cutoff,
+                       failed_windows=int((matches >= self.apt_cutoff).sum()))
+
+    def report(self):
+        n = self.total_bits
+        if not n:
+            return {"bits": 0, "alarms": dict(self.alarms)}
+
+        # The runs test over the sampled pairs of adjacent bits, scaled up to the
+        # whole stream for the runs estimate
+        proportion = self.ones / n
+        pairs = self.pairs
+        spread = 2 * math.sqrt(2 * pairs) * proportion * (1 - proportion)
+        expected = 2 * pairs * proportion * (1 - proportion)
+        return {
+            "bits": n,
+            "ones_fraction": proportion,
+            "monobit_p_value": math.erfc(abs(2 * self.ones - n) / math.sqrt(2 * n)),
+            "runs": 1 + round(self.transitions * (n - 1) / pairs) if pairs else 1,
+            "runs_p_value": math.erfc(abs(self.transitions - expected) / spread) if spread else 0.0,
+            "runs_sampled_pairs": pairs,
+            "longest_run": self.longest_run,
+            "max_window_proportion": self.max_proportion,
+            "min_entropy_bit": most_common_value_entropy([n - self.ones, self.ones]),
+            "min_entropy_byte": most_common_value_entropy(self.byte_counts) / 8,
+            "rct_cutoff": self.rct_cutoff,
+            "apt_cutoff": self.apt_cutoff,
+            "alarms": dict(self.alarms)
+        }
+
+
+def test_file(filepath, monitor=None):
+    """
+    Run the health tests offline over a bitstring text file or a packed .qrng file.
+    """
+    monitor = monitor or HealthMonitor(estimate_stride=1)
+    with open(filepath, "rb") as f:
+        packed_file = f.read(len(MAGIC)) == MAGIC
+
+    if packed_file:
+        data = PackedFile(filepath)
+        total = len(data) * data.bits_per_sample
+        for start in range(0, len(data.payload), CHUNK_BYTES):
+            chunk = data.payload[start:start + CHUNK_BYTES]
+            monitor.update(chunk, min(8 * len(chunk), total - 8 * start))
+        return monitor.report()
+
+    with open(filepath, "r") as f:
+        lines = []
+        for line in f:
+            if line.strip():
+                lines.append(line.strip())
+            if len(lines) == CHUNK_LINES:
+                monitor.update_bits(np.frombuffer("".join(lines).encode(), dtype=np.uint8) - ord("0"))
+                lines = []
+        if lines:
+            monitor.update_bits(np.frombuffer("".join(lines).encode(), dtype=np.uint8) - ord("0"))
+    return monitor.finish()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SP 800-90B style health tests for QRNG output")
+    parser.add_argument("file", nargs="?", default="output/random_bits.txt")
+    parser.add_argument("--min-entropy", type=float, default=1.0, help="Claimed min-entropy per bit")
+    args = parser.parse_args()
+
+    def print_alarm(test, details):
+        print(f"ALARM {test}: {details}")
+
+    # Offline there is no throughput to protect, so the estimates use every word
+    report = test_file(args.file, HealthMonitor(args.min_entropy, on_alarm=print_alarm, estimate_stride=1))
+    for name, value in report.items():
+        print(f"{name:<22} {value}")
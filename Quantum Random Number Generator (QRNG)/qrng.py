@@ -1,4 +1,6 @@
-from qrng_utils import generate_random_numbers
+from health_tests import HealthMonitor
+from qrng_format import save_packed
+from qrng_utils import REGISTER_WIDTH, generate_random_bits, get_backend
 import os
 
 def save_to_file(bits_list, filepath):
@@ -13,11 +15,21 @@ def main():
 
     print(f"Generating {n_samples} true quantum random numbers with {n_bits} bits each...")
 
-    random_bits = generate_random_numbers(n_bits, n_samples)
+    bits = generate_random_bits(n_bits * n_samples)
+    monitor = HealthMonitor(on_alarm=lambda test, details: print(f"Health test alarm ({test}): {details}"))
+    monitor.update_bits(bits)
+    health = monitor.finish()
+    text = (bits + ord('0')).tobytes().decode()
+    random_bits = [text[i * n_bits:(i + 1) * n_bits] for i in range(n_samples)]
 
     output_dir = "output"
     os.makedirs(output_dir, exist_ok=True)
     save_to_file(random_bits, os.path.join(output_dir, "random_bits.txt"))
+    save_packed(bits, n_bits, os.path.join(output_dir, "random_bits.qrng"),
+                metadata={"backend": get_backend().name, "register_width": REGISTER_WIDTH, "seed": None})
+
+    print(f"Health tests: {sum(health['alarms'].values())} alarms, "
+          f"min-entropy estimate {health['min_entropy_bit']:.3f} bits/bit")
 
     print("Sample Output:")
     for i in range(min(5, len(random_bits))):
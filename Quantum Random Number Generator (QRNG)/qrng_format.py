@@ -0,0 +1,179 @@
+import itertools
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+# Layout of a .qrng file
+#   header : magic, version, bits per sample, header size, sample count,
+#            CRC32 of the payload, metadata length, JSON metadata, zero padding
+#   payload: samples concatenated as one MSB-first bit stream, zero padded to a byte
+# A sample therefore has the value int(bitstring, 2) of its legacy text line, and
+# 8/16/32/64-bit samples are plain big-endian integers in the payload.
+MAGIC = b"QRNG"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQII")
+HEADER_ALIGNMENT = 64
+DIRECT_WIDTHS = {8: ">u1", 16: ">u2", 32: ">u4", 64: ">u8"}
+CHUNK_BYTES = 1 << 20
+CHUNK_LINES = 1 << 16
+
+
+class PackedWriter:
+    """
+    Streams 0/1 bit arrays into a .qrng file. The sample count and checksum are
+    filled into the header on close, so the total size need not be known upfront.
+    """
+
+    def __init__(self, filepath, bits_per_sample, metadata=None):
+        if not 1 <= bits_per_sample <= 64:
+            raise ValueError("bits_per_sample must be between 1 and 64")
+        self.filepath = filepath
+        self.bits_per_sample = bits_per_sample
+        self.meta = json.dumps(metadata or {}).encode()
+        self.header_size = -(-(HEADER.size + len(self.meta)) // HEADER_ALIGNMENT) * HEADER_ALIGNMENT
+        self.total_bits = 0
+        self.crc = 0
+        self.pending = np.zeros(0, dtype=np.uint8)  # bits left over from the last partial byte
+
+        self.file = open(filepath, "wb")
+        self.file.write(bytes(self.header_size))
+
+    def write_bits(self, bits):
+        bits = np.concatenate((self.pending, np.asarray(bits, dtype=np.uint8)))
+        whole = len(bits) // 8 * 8
+        self.write_payload(np.packbits(bits[:whole]).tobytes())
+        self.pending = bits[whole:]
+        self.total_bits += whole
+
+    def write_payload(self, data):
+        self.crc = zlib.crc32(data, self.crc)
+        self.file.write(data)
+
+    def close(self):
+        if self.file.closed:
+            return
+        if len(self.pending):
+            self.write_payload(np.packbits(self.pending).tobytes())
+            self.total_bits += len(self.pending)
+        if self.total_bits % self.bits_per_sample:
+            self.abort()
+            raise ValueError(f"{self.total_bits} bits is not a whole number of {self.bits_per_sample}-bit samples")
+
+        count = self.total_bits // self.bits_per_sample
+        header = HEADER.pack(MAGIC, VERSION, self.bits_per_sample, self.header_size, count, self.crc, len(self.meta))
+        self.file.seek(0)
+        self.file.write(header + self.meta)
+        self.file.close()
+
+    def abort(self):
+        """
+        Close without finalizing the header and delete the partial file.
+        """
+        if not self.file.closed:
+            self.file.close()
+            os.remove(self.filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class PackedFile:
+    """
+    Memory-mapped view of a .qrng file. Nothing is read until samples are accessed.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, "rb") as f:
+            fields = HEADER.unpack(f.read(HEADER.size))
+            magic, version, self.bits_per_sample, self.header_size, self.count, self.crc, meta_length = fields
+            if magic != MAGIC:
+                raise ValueError(f"{filepath} is not a QRNG data file")
+            if version != VERSION:
+                raise ValueError(f"Unsupported QRNG file version {version}")
+            self.metadata = json.loads(f.read(meta_length) or b"{}")
+
+        payload_bytes = -(-self.count * self.bits_per_sample // 8)
+        self.payload = np.memmap(filepath, dtype=np.uint8, mode="r", offset=self.header_size, shape=(payload_bytes,))
+
+    def __len__(self):
+        return self.count
+
+    def samples(self, start=0, stop=None):
+        """
+        Samples start..stop as unsigned integers. For 8/16/32/64-bit samples this
+        is a zero-copy view of the mapped file; other widths are decoded.
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        width = self.bits_per_sample
+        if width in DIRECT_WIDTHS:
+            step = width // 8
+            return self.payload[start * step:stop * step].view(DIRECT_WIDTHS[width])
+
+        bits = np.unpackbits(self.payload[start * width // 8:-(-stop * width // 8)])
+        offset = start * width % 8
+        bits = bits[offset:offset + (stop - start) * width].reshape(-1, width)
+        weights = np.uint64(1) << np.arange(width - 1, -1, -1, dtype=np.uint64)
+        return bits.astype(np.uint64) @ weights
+
+    def iter_samples(self, chunk_size=CHUNK_LINES):
+        for start in range(0, self.count, chunk_size):
+            yield self.samples(start, start + chunk_size)
+
+    def bits(self):
+        """
+        Flat 0/1 array of every sampled bit.
+        """
+        return np.unpackbits(self.payload, count=self.count * self.bits_per_sample)
+
+    def verify(self):
+        crc = 0
+        for start in range(0, len(self.payload), CHUNK_BYTES):
+            crc = zlib.crc32(self.payload[start:start + CHUNK_BYTES], crc)
+        return crc == self.crc
+
+
+def save_packed(bits, bits_per_sample, filepath, metadata=None):
+    """
+    Write a flat 0/1 array of samples to a .qrng file.
+    """
+    with PackedWriter(filepath, bits_per_sample, metadata) as writer:
+        writer.write_bits(bits)
+    print(f"Saved {len(bits) // bits_per_sample} packed {bits_per_sample}-bit samples to: {filepath}")
+
+
+def convert_text_file(input_file, output_file, metadata=None, chunk_lines=CHUNK_LINES):
+    """
+    Convert a legacy file of one bitstring per line to a .qrng file, reading
+    `chunk_lines` lines at a time so memory use does not grow with the file.
+    """
+    with open(input_file, "r") as f:
+        lines = (line.strip() for line in f)
+        lines = (line for line in lines if line)
+        first = next(lines, None)
+        if first is None:
+            raise ValueError(f"{input_file} contains no bitstrings")
+
+        lines = itertools.chain([first], lines)
+        with PackedWriter(output_file, len(first), metadata) as writer:
+            while True:
+                chunk = list(itertools.islice(lines, chunk_lines))
+                if not chunk:
+                    break
+                if any(len(line) != len(first) for line in chunk):
+                    raise ValueError("All bitstrings must have the same length")
+                bits = np.frombuffer("".join(chunk).encode(), dtype=np.uint8) - ord("0")
+                if bits.max() > 1:
+                    raise ValueError("Bitstrings may only contain 0 and 1")
+                writer.write_bits(bits)
+
+    return PackedFile(output_file)
@@ -0,0 +1,276 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from extractors import EXTRACTORS, make_extractor
+from health_tests import HealthMonitor, HealthTestFailure
+from qrng_utils import generate_random_bits
+
+DEFAULT_CAPACITY = 1 << 20      # bytes of buffered randomness
+DEFAULT_REFILL_BITS = 1 << 22   # bits generated per simulator batch
+MAX_HTTP_BYTES = 1 << 16
+HTTP_READ_TIMEOUT = 10.0        # seconds a request waits for bytes before a 503
+
+
+class RingBuffer:
+    """
+    Fixed-size byte ring buffer for one producer and any number of consumers.
+    Callers hold `lock` (via the owning service) around every operation.
+    """
+
+    def __init__(self, capacity):
+        self.data = bytearray(capacity)
+        self.capacity = capacity
+        self.start = 0
+        self.size = 0
+
+    @property
+    def free(self):
+        return self.capacity - self.size
+
+    def write(self, chunk):
+        """
+        Append as much of `chunk` as fits and return the number of bytes written.
+        """
+        count = min(len(chunk), self.free)
+        end = (self.start + self.size) % self.capacity
+        first = min(count, self.capacity - end)
+        self.data[end:end + first] = chunk[:first]
+        self.data[:count - first] = chunk[first:count]
+        self.size += count
+        return count
+
+    def read(self, n):
+        """
+        Remove and return up to n bytes from the front of the buffer.
+        """
+        count = min(n, self.size)
+        first = min(count, self.capacity - self.start)
+        out = bytes(self.data[self.start:self.start + first]) + bytes(self.data[:count - first])
+        self.start = (self.start + count) % self.capacity
+        self.size -= count
+        return out
+
+    def unread(self, chunk):
+        """
+        Put bytes taken by read() back at the front of the buffer, as many as fit,
+        and return the number of bytes restored.
+        """
+        count = min(len(chunk), self.free)
+        start = (self.start - count) % self.capacity
+        first = min(count, self.capacity - start)
+        self.data[start:start + first] = chunk[:first]
+        self.data[:count - first] = chunk[first:count]
+        self.start = start
+        self.size += count
+        return count
+
+
+class QRNGService:
+    """
+    Background QRNG: a producer thread keeps a ring buffer of packed random bytes
+    between the low and high watermarks, so reads are served from memory.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, low_watermark=0.25, high_watermark=0.9,
+                 refill_bits=DEFAULT_REFILL_BITS, generator=generate_random_bits, extractor=None,
+                 monitor=None):
+        self.buffer = RingBuffer(capacity)
+        self.low = int(capacity * low_watermark)
+        self.high = int(capacity * high_watermark)
+        self.refill_bits = refill_bits
+        self.generator = generator
+        self.extractor = extractor  # optional extractors.Extractor applied before buffering
+        self.monitor = monitor      # optional health_tests.HealthMonitor fed the raw bits; any alarm stops output
+
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.running = False
+        self.producer = None
+        self.error = None           # exception that stopped the producer, re-raised by read()
+        self.bytes_produced = 0
+        self.bytes_served = 0
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.error = None
+        self.producer = threading.Thread(target=self.produce, name="qrng-producer", daemon=True)
+        self.producer.start()
+        return self
+
+    def stop(self):
+        with self.changed:
+            self.running = False
+            self.changed.notify_all()
+        if self.producer:
+            self.producer.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def produce(self):
+        try:
+            self.fill()
+        except Exception as e:
+            # Wake every waiting reader so it sees the failure instead of blocking forever
+            with self.changed:
+                if isinstance(e, HealthTestFailure):
+                    # The source is suspect, so nothing it produced is served any more
+                    self.buffer.read(self.buffer.size)
+                self.error = e
+                self.changed.notify_all()
+
+    def fill(self):
+        while True:
+            with self.changed:
+                # Sleep until a consumer drains the buffer below the low watermark
+                self.changed.wait_for(lambda: not self.running or self.buffer.size < self.low)
+                if not self.running:
+                    return
+
+            # Generate outside the lock so consumers keep being served
+            while True:
+                chunk = np.packbits(self.generator(self.refill_bits))
+                if self.monitor:
+                    self.monitor.update(chunk)
+                    if any(self.monitor.alarms.values()):
+                        raise HealthTestFailure(f"Health test alarms {self.monitor.alarms}")
+                if self.extractor:
+                    chunk = self.extractor.process(chunk)
+                chunk = chunk.tobytes()
+                with self.changed:
+                    if not self.running:
+                        return
+                    written = self.buffer.write(chunk)
+                    self.bytes_produced += written
+                    self.changed.notify_all()
+                    if written < len(chunk) or self.buffer.size >= self.high:
+                        break
+
+    def read(self, n, timeout=None):
+        """
+        Return exactly n random bytes, waiting for the producer if the buffer runs dry.
+        Raises TimeoutError if they are not all available within `timeout` seconds,
+        leaving any bytes already taken in the buffer for the next read, and
+        RuntimeError once the buffer is empty and the producer has stopped or failed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        out = bytearray()
+        with self.changed:
+            while len(out) < n:
+                ready = lambda: self.buffer.size > 0 or not self.running or self.error is not None
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                if not self.changed.wait_for(ready, remaining):
+                    self.buffer.unread(out)
+                    raise TimeoutError(f"Only {len(out)} of {n} random bytes available")
+                if self.buffer.size == 0:
+                    if self.error is not None:
+                        raise RuntimeError("QRNG producer failed") from self.error
+                    raise RuntimeError("QRNG service is not running")
+                out += self.buffer.read(n - len(out))
+                if self.buffer.size < self.low:
+                    self.changed.notify_all()
+            self.bytes_served += n
+        return bytes(out)
+
+    def __iter__(self):
+        return self.iter_bytes()
+
+    def iter_bytes(self, chunk_size=32):
+        while True:
+            yield self.read(chunk_size)
+
+    def status(self):
+        with self.lock:
+            return {
+                "buffered_bytes": self.buffer.size,
+                "capacity": self.buffer.capacity,
+                "low_watermark": self.low,
+                "high_watermark": self.high,
+                "bytes_produced": self.bytes_produced,
+                "bytes_served": self.bytes_served,
+                "error": None if self.error is None else repr(self.error)
+            }
+
+
+def make_handler(service):
+    class QRNGRequestHandler(BaseHTTPRequestHandler):
+        """
+        GET /random?bytes=N[&format=hex]  -> N random bytes (raw or hex)
+        GET /status                       -> buffer fill level as JSON
+        """
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+
+            if url.path == "/status":
+                self.reply(200, json.dumps(service.status()).encode(), "application/json")
+            elif url.path == "/random":
+                try:
+                    n = int(query.get("bytes", ["32"])[0])
+                except ValueError:
+                    n = -1
+                if not 0 < n <= MAX_HTTP_BYTES:
+                    self.reply(400, f"bytes must be between 1 and {MAX_HTTP_BYTES}\n".encode(), "text/plain")
+                    return
+                try:
+                    data = service.read(n, timeout=HTTP_READ_TIMEOUT)
+                except (TimeoutError, RuntimeError) as e:
+                    self.reply(503, f"{e}\n".encode(), "text/plain")
+                    return
+                if query.get("format", [""])[0] == "hex":
+                    self.reply(200, data.hex().encode(), "text/plain")
+                else:
+                    self.reply(200, data, "application/octet-stream")
+            else:
+                self.reply(404, b"Not found\n", "text/plain")
+
+        def reply(self, code, body, content_type):
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep the console quiet under load
+
+    return QRNGRequestHandler
+
+
+def serve_http(service, host="127.0.0.1", port=8000):
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"QRNG service listening on http://{host}:{server.server_address[1]}/random?bytes=32")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve buffered quantum random bytes over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="Buffer size in bytes")
+    parser.add_argument("--extractor", choices=EXTRACTORS, default=None, help="Condition raw bits before serving")
+    parser.add_argument("--min-entropy", type=float, default=1.0, help="Claimed min-entropy per raw bit")
+    args = parser.parse_args()
+
+    extractor = make_extractor(args.extractor) if args.extractor else None
+    monitor = HealthMonitor(args.min_entropy,
+                            on_alarm=lambda test, details: print(f"Health test alarm ({test}): {details}; output stopped"))
+    with QRNGService(capacity=args.capacity, extractor=extractor, monitor=monitor) as service:
+        server = serve_http(service, args.host, args.port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
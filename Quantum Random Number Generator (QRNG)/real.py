@@ -1,23 +1,39 @@
-def convert_bitstrings_to_integers(input_file, output_file):
-    integers = []
-    
-    with open(input_file, 'r') as f:
-        for line in f:
-            bitstring = line.strip()
-            if bitstring:  # Skip empty lines
-                integer = int(bitstring, 2)
-                integers.append(integer)
-    
+import os
+import tempfile
+from qrng_format import MAGIC, CHUNK_LINES, PackedFile, convert_text_file
+
+def is_packed_file(filepath):
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def write_integers(data, output_file):
     with open(output_file, 'w') as f:
-        for i in integers:
-            f.write(str(i) + '\n')
+        for chunk in data.iter_samples(CHUNK_LINES):
+            f.write('\n'.join(map(str, chunk.tolist())))
+            f.write('\n')
 
-    print(f"Converted {len(integers)} bitstrings to integers.")
+    print(f"Converted {len(data)} bitstrings to integers.")
     print(f"Output saved to: {output_file}")
     print("Sample:")
-    for i in integers[:5]:
+    for i in data.samples(0, 5).tolist():
         print(i)
 
+def convert_bitstrings_to_integers(input_file, output_file):
+    """
+    Write the samples of a bitstring text file or packed .qrng file as decimal integers,
+    one chunk of samples at a time.
+    """
+    if is_packed_file(input_file):
+        write_integers(PackedFile(input_file), output_file)
+        return
+
+    # Text input is packed into a scratch file, so no .qrng file next to the
+    # input (such as the one written by qrng.py) is overwritten
+    with tempfile.TemporaryDirectory() as scratch:
+        data = convert_text_file(input_file, os.path.join(scratch, 'input.qrng'))
+        write_integers(data, output_file)
+        del data  # release the memory map before the directory is removed
+
 if __name__ == "__main__":
     input_path = "output/random_bits.txt"
     output_path = "output/random_integers.txt"
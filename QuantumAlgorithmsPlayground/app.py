@@ -1,65 +1,169 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+from qiskit.exceptions import MissingOptionalLibraryError
 from backend import simulate
-from plot_utils import show_circuit, show_results
+from plot_utils import circuit_text, draw_circuit, draw_histogram, use_mpl_drawer
 import deutsch_jozsa
 import grover
 import bernstein_vazirani
 
+POLL_INTERVAL_MS = 50
+
 class QuantumApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Quantum Algorithms Playground")
-        self.root.geometry("900x600")
+        self.root.geometry("1100x700")
+
+        # Background job state, polled from the Tk main loop via root.after
+        self.messages = queue.Queue()
+        self.worker = None
+        self.status_var = tk.StringVar(value="Idle")
 
         self.setup_widgets()
 
     def setup_widgets(self):
+        controls = ttk.Frame(self.root)
+        controls.pack(pady=10)
+
         # Dropdown
-        self.label = ttk.Label(self.root, text="Select Quantum Algorithm:")
-        self.label.pack(pady=10)
+        self.label = ttk.Label(controls, text="Select Quantum Algorithm:")
+        self.label.grid(row=0, column=0, sticky="w")
 
         self.algorithm_var = tk.StringVar()
-        self.dropdown = ttk.Combobox(self.root, textvariable=self.algorithm_var)
+        self.dropdown = ttk.Combobox(controls, textvariable=self.algorithm_var)
         self.dropdown['values'] = ["Deutsch-Jozsa", "Grover", "Bernstein-Vazirani"]
-        self.dropdown.pack(pady=5)
+        self.dropdown.grid(row=0, column=1, padx=5)
 
         # Input box for Oracle string (for BV and Grover)
-        self.oracle_label = ttk.Label(self.root, text="Oracle (optional for BV/Grover, e.g. 101)")
-        self.oracle_label.pack()
-        self.oracle_entry = ttk.Entry(self.root)
-        self.oracle_entry.pack(pady=5)
+        self.oracle_label = ttk.Label(controls, text="Oracle (BV secret, e.g. 101; Grover marked states, e.g. 101,011)")
+        self.oracle_label.grid(row=1, column=0, columnspan=2, sticky="w", pady=(10, 0))
+        self.oracle_entry = ttk.Entry(controls, width=50)
+        self.oracle_entry.grid(row=2, column=0, columnspan=2, sticky="we", pady=5)
 
         # Run Button
-        self.run_button = ttk.Button(self.root, text="Run Algorithm", command=self.run_algorithm)
-        self.run_button.pack(pady=15)
+        self.run_button = ttk.Button(controls, text="Run Algorithm", command=self.run_algorithm)
+        self.run_button.grid(row=3, column=0, columnspan=2, pady=10)
+
+        ttk.Label(self.root, textvariable=self.status_var).pack()
+
+        # Output Frame: circuit on the left, histogram on the right. Both figures
+        # are created once and redrawn in place on every run.
+        self.output_frame = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
+        self.output_frame.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.circuit_frame = ttk.Frame(self.output_frame)
+        self.circuit_fig = Figure(figsize=(6, 4))
+        self.circuit_ax = self.circuit_fig.add_subplot(111)
+        self.circuit_ax.axis("off")
+        self.circuit_canvas = FigureCanvasTkAgg(self.circuit_fig, master=self.circuit_frame)
+        self.circuit_canvas.get_tk_widget().pack(fill="both", expand=True)
 
-        # Output Frame
-        self.output_frame = tk.Frame(self.root)
-        self.output_frame.pack(fill="both", expand=True)
+        # Wide circuits are shown as folded text instead of a figure
+        self.circuit_text = tk.Text(self.circuit_frame, wrap="none", font=("Courier", 9))
+        x_scroll = ttk.Scrollbar(self.circuit_frame, orient=tk.HORIZONTAL, command=self.circuit_text.xview)
+        y_scroll = ttk.Scrollbar(self.circuit_frame, orient=tk.VERTICAL, command=self.circuit_text.yview)
+        self.circuit_text.configure(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        self.text_widgets = (y_scroll, x_scroll, self.circuit_text)
+
+        self.hist_frame = ttk.Frame(self.output_frame)
+        self.hist_fig = Figure(figsize=(5, 4))
+        self.hist_ax = self.hist_fig.add_subplot(111)
+        self.hist_canvas = FigureCanvasTkAgg(self.hist_fig, master=self.hist_frame)
+        self.hist_canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        self.output_frame.add(self.circuit_frame, weight=3)
+        self.output_frame.add(self.hist_frame, weight=2)
 
     def run_algorithm(self):
+        if self.worker and self.worker.is_alive():
+            messagebox.showinfo("Busy", "An algorithm is already running.")
+            return
+
         algo = self.algorithm_var.get()
-        oracle = self.oracle_entry.get()
+        if algo not in ("Deutsch-Jozsa", "Grover", "Bernstein-Vazirani"):
+            messagebox.showerror("Error", "Please select a valid algorithm.")
+            return
 
+        self.run_button.state(['disabled'])
+        self.status_var.set(f"Running {algo}...")
+        self.worker = threading.Thread(target=self.algorithm_worker, args=(algo, self.oracle_entry.get()), daemon=True)
+        self.worker.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+
+    def algorithm_worker(self, algo, oracle):
+        # Runs on the worker thread: only talk to the UI through the message queue
         try:
             if algo == "Deutsch-Jozsa":
                 qc = deutsch_jozsa.build_circuit()
             elif algo == "Grover":
                 qc = grover.build_circuit(oracle)
-            elif algo == "Bernstein-Vazirani":
+            else:
                 qc = bernstein_vazirani.build_circuit(oracle)
+
+            result, counts = simulate(qc, mode="auto")
+            # Text drawing of wide circuits is slow too, so it is also done here
+            text = None if use_mpl_drawer(qc) else circuit_text(qc)
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+            return
+        self.messages.put(("done", algo, qc, result, counts, text))
+
+    def poll_worker(self):
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_message(*message)
+
+        if self.worker.is_alive() or not self.messages.empty():
+            self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+        else:
+            self.run_button.state(['!disabled'])
+
+    def handle_message(self, kind, *payload):
+        if kind == "error":
+            self.status_var.set("Failed")
+            messagebox.showerror("Error", payload[0])
+        elif kind == "done":
+            self.show_result(*payload)
+
+    def show_result(self, algo, qc, result, counts, text):
+        status = f"{algo}: {qc.num_qubits} qubits, {sum(counts.values())} shots ({getattr(result, 'method', 'sampled')})"
+        if qc.metadata and "success_probability" in qc.metadata:
+            status += f", {qc.metadata['iterations']} iterations, P(success) {qc.metadata['success_probability']:.3f}"
+        self.status_var.set(status)
+
+        self.show_circuit(qc, text)
+        draw_histogram(self.hist_ax, counts)
+        self.hist_fig.tight_layout()
+        self.hist_canvas.draw_idle()
+
+    def show_circuit(self, qc, text):
+        canvas = self.circuit_canvas.get_tk_widget()
+        if text is None:
+            for widget in self.text_widgets:
+                widget.pack_forget()
+            canvas.pack(fill="both", expand=True)
+            try:
+                draw_circuit(self.circuit_ax, qc)
+            except MissingOptionalLibraryError:
+                # The matplotlib drawer needs pylatexenc; the text drawer always works
+                text = circuit_text(qc)
             else:
-                messagebox.showerror("Error", "Please select a valid algorithm.")
+                self.circuit_canvas.draw_idle()
                 return
 
-            # Simulate and plot
-            result, counts = simulate(qc)
-            show_circuit(qc)
-            show_results(result, counts)
-
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        canvas.pack_forget()
+        for widget, side, fill in zip(self.text_widgets, ("right", "bottom", "left"), ("y", "x", "both")):
+            widget.pack(side=side, fill=fill, expand=widget is self.circuit_text)
+        self.circuit_text.delete(1.0, tk.END)
+        self.circuit_text.insert(tk.END, text)
 
 if __name__ == '__main__':
     root = tk.Tk()
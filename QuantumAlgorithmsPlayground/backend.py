@@ -1,11 +1,419 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
 from qiskit_aer import Aer
-from qiskit import transpile
+from qiskit import QuantumCircuit, transpile
+from qiskit.circuit import Gate, Instruction
+from qiskit.quantum_info import Clifford
 from qiskit.visualization import plot_histogram
 
-def simulate(qc):
-    backend = Aer.get_backend('qasm_simulator')
-    transpiled = transpile(qc, backend)
-    job = backend.run(transpiled, shots=1024)
-    result = job.result()
-    counts = result.get_counts()
-    return result, counts
+DEFAULT_SHOTS = 1024
+MAX_TRANSPILED = 128
+MAX_RESULTS = 256
+
+# Aer fuses gates itself, so heavier transpiler optimization only adds latency
+# (about 40x on a 16-qubit Grover search) without speeding up the simulation
+OPTIMIZATION_LEVEL = 1
+
+# Execution modes of simulate(): sampled shots on Aer, exact probabilities from the
+# statevector, or exact evaluation whenever the circuit allows it
+MODES = ("shots", "statevector", "auto")
+AUTO_MAX_QUBITS = 16
+# Clifford gates that Aer's stabilizer method simulates natively
+CLIFFORD_GATES = {"id", "x", "y", "z", "h", "s", "sdg", "sx", "sxdg", "cx", "cy", "cz", "swap"}
+DETERMINISTIC_TOLERANCE = 1e-9
+
+
+def circuit_key(qc, gate_keys=None):
+    """
+    Structural hash of a circuit: its register layout and every instruction's
+    name, parameters and operands. User-defined gates (from to_gate/to_instruction)
+    are hashed by their definition, since their names are generated, so circuits
+    built the same way share a key.
+    """
+    gate_keys = {} if gate_keys is None else gate_keys
+    digest = hashlib.sha256()
+    # Register names and sizes decide how counts keys are split and ordered
+    for register in qc.qregs + qc.cregs:
+        digest.update(f"{type(register).__name__}:{register.name}:{register.size};".encode())
+    digest.update(f"{qc.num_qubits},{qc.num_clbits};".encode())
+    for instruction in qc.data:
+        op = instruction.operation
+        name = op.name
+        if type(op) in (Gate, Instruction) and op.definition is not None:
+            if id(op) not in gate_keys:
+                gate_keys[id(op)] = circuit_key(op.definition, gate_keys)
+            name = gate_keys[id(op)]
+        qubits = [qc.find_bit(q).index for q in instruction.qubits]
+        clbits = [qc.find_bit(c).index for c in instruction.clbits]
+        digest.update(f"{name}{qubits}{clbits}".encode())
+        for p in op.params:
+            # str() of an array rounds and elides entries, so hash its bytes
+            if isinstance(p, np.ndarray):
+                digest.update(f"{p.dtype}{p.shape}".encode() + p.tobytes())
+            else:
+                digest.update(repr(float(p) if isinstance(p, (int, float)) else p).encode())
+            digest.update(b";")
+    return digest.hexdigest()
+
+
+def is_clifford(qc):
+    """
+    True if every gate, including those inside user-defined gates, is a Clifford gate.
+    """
+    for instruction in qc.data:
+        op = instruction.operation
+        if op.name in CLIFFORD_GATES or op.name in ("barrier", "measure"):
+            continue
+        if type(op) in (Gate, Instruction) and op.definition is not None and is_clifford(op.definition):
+            continue
+        return False
+    return True
+
+
+def flatten(qc):
+    """
+    The circuit with user-defined gates replaced by their definitions, recursively.
+    Library gates are kept as they are.
+    """
+    if not any(type(i.operation) in (Gate, Instruction) for i in qc.data):
+        return qc
+    flat = qc.copy_empty_like()
+    for instruction in qc.data:
+        op = instruction.operation
+        if type(op) in (Gate, Instruction) and op.definition is not None:
+            flat.compose(flatten(op.definition), qubits=instruction.qubits, clbits=instruction.clbits, inplace=True)
+        else:
+            flat.append(instruction)
+    return flat
+
+
+def split_final_measurements(qc):
+    """
+    The circuit without its measurements and the (qubit, clbit) pairs they measured,
+    or None if a measurement is followed by anything other than other measurements.
+    """
+    unitary = QuantumCircuit(qc.num_qubits)
+    measured = {}
+    for instruction in qc.data:
+        op = instruction.operation
+        qubits = [qc.find_bit(q).index for q in instruction.qubits]
+        if op.name == "barrier":
+            continue
+        if op.name == "measure":
+            clbit = qc.find_bit(instruction.clbits[0]).index
+            if qubits[0] in measured or clbit in measured.values():
+                return None
+            measured[qubits[0]] = clbit
+        elif instruction.clbits or measured.keys() & set(qubits) or op.name == "reset":
+            return None  # mid-circuit measurement, reset or classical control
+        else:
+            unitary.append(op, qubits)
+    return unitary, sorted(measured.items(), key=lambda pair: pair[1])
+
+
+def exact_probabilities(qc, backend):
+    """
+    Exact outcome distribution as {classical register value: probability}, where
+    bit i of the value is classical bit i, or None if it cannot be computed from
+    a single statevector. The statevector is evolved on `backend` with Aer's
+    statevector method, which is far faster than quantum_info.Statevector on
+    circuits built from large user-defined gates such as Grover's.
+    """
+    split = split_final_measurements(qc)
+    if split is None:
+        return None
+    unitary, measured = split
+    if not measured:
+        return {0: 1.0}
+
+    unitary.save_probabilities([qubit for qubit, _ in measured])
+    circuit = transpile(unitary, backend, optimization_level=OPTIMIZATION_LEVEL)
+    probabilities = backend.run(circuit, shots=1, method="statevector").result().data()["probabilities"]
+    values = np.zeros(len(probabilities), dtype=np.int64)
+    for k, (_, clbit) in enumerate(measured):
+        values |= ((np.arange(len(probabilities)) >> k) & 1) << clbit
+    return {int(values[i]): float(probabilities[i]) for i in np.flatnonzero(probabilities > 1e-12)}
+
+
+def synthesize_counts(probabilities, shots):
+    """
+    Expected counts rounded with the largest remainder method, so they add up to `shots`.
+    """
+    values = list(probabilities)
+    expected = np.array([probabilities[v] for v in values]) * shots
+    counts = np.floor(expected).astype(np.int64)
+    order = np.argsort(counts - expected)  # largest fractional parts first
+    counts[order[:shots - counts.sum()]] += 1
+    return {v: int(c) for v, c in zip(values, counts) if c}
+
+
+def register_key(bits, qc):
+    """
+    Aer-style counts key from a bitstring with classical bit 0 rightmost:
+    registers are separated by spaces, the first register rightmost.
+    """
+    registers, end = [], len(bits)
+    for creg in qc.cregs:
+        registers.append(bits[end - creg.size:end])
+        end -= creg.size
+    return " ".join(reversed(registers)) if registers else bits
+
+
+def counts_key(value, qc):
+    return register_key(format(value, f"0{qc.num_clbits}b"), qc)
+
+
+def gf2_row_basis(matrix):
+    """
+    Basis of the row space of a 0/1 matrix over GF(2), by elimination on bit-packed rows.
+    """
+    width = matrix.shape[1]
+    rows = np.packbits(np.asarray(matrix, dtype=bool), axis=1)
+    rows = rows[np.any(rows, axis=1)]
+    basis = []
+    for col in range(width):
+        if not len(rows):
+            break
+        hits = np.flatnonzero(rows[:, col // 8] & (0x80 >> (col % 8)))
+        if not len(hits):
+            continue
+        pivot = rows[hits[0]].copy()
+        rows[hits] ^= pivot
+        rows = rows[np.any(rows, axis=1)]
+        basis.append(pivot)
+    if not basis:
+        return np.zeros((0, width), dtype=np.uint8)
+    return np.unpackbits(np.array(basis), axis=1, count=width)
+
+
+class CountsResult:
+    """
+    Result computed without a sampled Aer run, with the get_counts() interface of
+    an Aer result. `method` is "exact" for counts synthesized from exact
+    probabilities, "sampled" for counts drawn from them and "stabilizer" for
+    counts drawn from a stabilizer state's outcome distribution.
+    """
+
+    def __init__(self, counts, method, probabilities=None):
+        self.counts = counts
+        self.method = method
+        self.probabilities = probabilities
+
+    def get_counts(self):
+        return self.counts
+
+    def get_probabilities(self):
+        if self.probabilities is None:
+            raise ValueError(f"Probabilities are not available for {self.method} results")
+        return self.probabilities
+
+
+class LRUCache:
+    """
+    Small thread-safe least-recently-used cache.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class BackendManager:
+    """
+    Owns one simulator instance plus caches of transpiled circuits (by structural
+    hash) and of results of seeded runs, which are deterministic.
+    """
+
+    def __init__(self, backend_name='qasm_simulator', max_transpiled=MAX_TRANSPILED, max_results=MAX_RESULTS):
+        self.backend = Aer.get_backend(backend_name)
+        self.transpiled = LRUCache(max_transpiled)
+        self.results = LRUCache(max_results)
+        self.transpile_time = 0.0
+        self.run_time = 0.0
+
+    def transpile(self, qc, key=None):
+        key = key or circuit_key(qc)
+        transpiled = self.transpiled.get(key)
+        if transpiled is None:
+            start = time.perf_counter()
+            transpiled = transpile(qc, self.backend, optimization_level=OPTIMIZATION_LEVEL)
+            self.transpile_time += time.perf_counter() - start
+            self.transpiled.put(key, transpiled)
+        return transpiled
+
+    def stabilizer_circuit(self, qc, key):
+        """
+        Clifford circuits skip transpilation, which could rewrite their gates into
+        non-Clifford basis gates; only user-defined gates are inlined.
+        """
+        flat = self.transpiled.get((key, "stabilizer"))
+        if flat is None:
+            flat = flatten(qc)
+            self.transpiled.put((key, "stabilizer"), flat)
+        return flat
+
+    def sample_stabilizer(self, qc, key, shots, seed):
+        """
+        Counts of a Clifford circuit whose measurements all come at the end.
+
+        Measuring a stabilizer state gives outcomes spread uniformly over an
+        affine subspace x0 + V, where V is spanned by the X parts of its
+        stabilizers. One stabilizer-method shot gives x0 and the final tableau
+        gives V, so all shots are drawn at once instead of through Aer's
+        per-shot sampling, which costs O(n^2) or more per shot.
+        """
+        split = split_final_measurements(qc)
+        if split is None or not split[1]:
+            return None
+        unitary, measured = split
+        clbits = [clbit for _, clbit in measured]
+
+        # Any point of the support serves as x0, so both parts are cached per circuit
+        support = self.transpiled.get((key, "support"))
+        if support is None:
+            stab_x = Clifford(flatten(unitary)).stab_x[:, [qubit for qubit, _ in measured]]
+            options = {"method": "stabilizer", "memory": True, "seed_simulator": 0}
+            first = self.backend.run(self.stabilizer_circuit(qc, key), shots=1, **options).result().get_memory()[0]
+            x0 = (np.frombuffer(first.replace(" ", "")[::-1].encode(), dtype=np.uint8) - ord("0"))[clbits]
+            support = (x0, gf2_row_basis(stab_x))
+            self.transpiled.put((key, "support"), support)
+        x0, span = support
+
+        start = time.perf_counter()
+        if len(span):
+            coefficients = np.random.default_rng(seed).integers(0, 2, (shots, len(span))).astype(np.float32)
+            offsets = np.rint(coefficients @ span.astype(np.float32)).astype(np.int64) & 1
+            outcomes, frequencies = np.unique(x0 ^ offsets.astype(np.uint8), axis=0, return_counts=True)
+        else:
+            outcomes, frequencies = x0[None, :], [shots]
+
+        counts = {}
+        bits = np.zeros(qc.num_clbits, dtype=np.uint8)
+        for row, frequency in zip(outcomes, frequencies):
+            bits[clbits] = row
+            counts[register_key((bits[::-1] + ord("0")).tobytes().decode(), qc)] = int(frequency)
+        self.run_time += time.perf_counter() - start
+
+        result = CountsResult(counts, "stabilizer")
+        return result, result.get_counts()
+
+    def probabilities(self, qc, key):
+        # Exact distributions are deterministic, so they are cached regardless of seed
+        cached = self.results.get((key, "probabilities"))
+        if cached is None:
+            cached = exact_probabilities(qc, self.backend) or {}
+            self.results.put((key, "probabilities"), cached)
+        return cached or None
+
+    def simulate_exact(self, qc, key, shots, seed, mode):
+        """
+        Exact-mode run, or None when "auto" should fall back to sampled shots.
+        """
+        if mode == "auto" and qc.num_qubits > AUTO_MAX_QUBITS:
+            return None
+        start = time.perf_counter()
+        probabilities = self.probabilities(qc, key)
+        if probabilities is None:
+            if mode == "statevector":
+                raise ValueError("Statevector mode needs a circuit whose measurements all come at the end")
+            return None
+
+        deterministic = max(probabilities.values()) >= 1 - DETERMINISTIC_TOLERANCE
+        if mode == "statevector" or deterministic or is_clifford(qc):
+            counts, method = synthesize_counts(probabilities, shots), "exact"
+        else:
+            # Random outcomes: keep shot statistics, but draw them from the exact distribution
+            values = list(probabilities)
+            p = np.array([probabilities[v] for v in values])
+            drawn = np.random.default_rng(seed).multinomial(shots, p / p.sum())
+            counts, method = {v: int(c) for v, c in zip(values, drawn) if c}, "sampled"
+        self.run_time += time.perf_counter() - start
+
+        result = CountsResult({counts_key(v, qc): c for v, c in counts.items()}, method,
+                              {counts_key(v, qc): p for v, p in probabilities.items()})
+        return result, result.get_counts()
+
+    def simulate(self, qc, shots=DEFAULT_SHOTS, seed=None, mode="shots"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {', '.join(MODES)}")
+        key = circuit_key(qc)
+        if mode != "shots":
+            outcome = self.simulate_exact(qc, key, shots, seed, mode)
+            if outcome is not None:
+                return outcome
+
+        if seed is not None:
+            cached = self.results.get((key, shots, seed))
+            if cached is not None:
+                return cached
+
+        # Clifford circuits run on the stabilizer tableau, whose cost grows
+        # polynomially with width instead of exponentially
+        if is_clifford(qc):
+            outcome = self.sample_stabilizer(qc, key, shots, seed)
+            if outcome is not None:
+                if seed is not None:
+                    self.results.put((key, shots, seed), outcome)
+                return outcome
+            circuit, options = self.stabilizer_circuit(qc, key), {"method": "stabilizer"}
+        else:
+            circuit, options = self.transpile(qc, key), {}
+        if seed is not None:
+            options["seed_simulator"] = seed
+        start = time.perf_counter()
+        result = self.backend.run(circuit, shots=shots, **options).result()
+        self.run_time += time.perf_counter() - start
+        outcome = (result, result.get_counts())
+
+        if seed is not None:
+            self.results.put((key, shots, seed), outcome)
+        return outcome
+
+    def stats(self):
+        return {
+            "transpile_hits": self.transpiled.hits,
+            "transpile_misses": self.transpiled.misses,
+            "result_hits": self.results.hits,
+            "result_misses": self.results.misses,
+            "transpile_time": self.transpile_time,
+            "run_time": self.run_time
+        }
+
+    def clear(self):
+        self.transpiled.clear()
+        self.results.clear()
+
+
+# Shared by every caller in the playground
+backend_manager = BackendManager()
+
+
+def simulate(qc, shots=DEFAULT_SHOTS, seed=None, mode="shots"):
+    return backend_manager.simulate(qc, shots, seed, mode)
@@ -0,0 +1,130 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from qiskit import transpile
+from backend import DEFAULT_SHOTS, OPTIMIZATION_LEVEL, backend_manager, circuit_key, is_clifford
+import bernstein_vazirani
+import grover
+
+BUILDERS = {
+    "bv": bernstein_vazirani.build_circuit,
+    "grover": grover.build_circuit
+}
+
+
+def all_secrets(n):
+    return ["".join(bits) for bits in itertools.product("01", repeat=n)]
+
+
+def expected_outcome(secret):
+    """
+    Counts key that a correct run returns most often. Qubit i is measured into
+    classical bit i, which Qiskit prints rightmost, so the key is the secret reversed.
+    """
+    return secret[::-1]
+
+
+def transpile_chunk(circuits):
+    # Runs in worker processes, each of which has its own backend_manager.
+    # Transpiling a list shares the pass manager setup across the whole chunk.
+    return transpile(circuits, backend_manager.backend, optimization_level=OPTIMIZATION_LEVEL, num_processes=1)
+
+
+def transpile_all(circuits, workers=None):
+    """
+    Transpile circuits through the shared cache, spreading the misses over a process pool.
+    """
+    keys = [circuit_key(qc) for qc in circuits]
+    transpiled = [backend_manager.transpiled.get(key) for key in keys]
+    missing = [i for i, tqc in enumerate(transpiled) if tqc is None]
+    if not missing:
+        return transpiled
+
+    start = time.perf_counter()
+    workers = min(workers or os.cpu_count(), len(missing))
+    pending = [circuits[i] for i in missing]
+    if workers <= 1:
+        done = transpile_chunk(pending)
+    else:
+        size = -(-len(pending) // workers)
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+        # Forking after Aer has started its thread pools can deadlock the children
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            done = [tqc for chunk in pool.map(transpile_chunk, chunks) for tqc in chunk]
+    backend_manager.transpile_time += time.perf_counter() - start
+
+    for i, tqc in zip(missing, done):
+        transpiled[i] = tqc
+        backend_manager.transpiled.put(keys[i], tqc)
+    return transpiled
+
+
+def run_batch(circuits, shots=DEFAULT_SHOTS, seed=None, workers=None, job_size=None):
+    """
+    Run many circuits as multi-circuit Aer jobs of `job_size` circuits (all of
+    them in one job by default) and yield each circuit's counts in order.
+    Batches of Clifford circuits skip Aer and use the stabilizer sampler instead.
+    """
+    circuits = list(circuits)
+    if all(is_clifford(qc) for qc in circuits):
+        # Clifford circuits are sampled from their stabilizer tableaus, which is
+        # faster than any Aer job, so there is nothing to batch
+        for qc in circuits:
+            yield backend_manager.simulate(qc, shots, seed)[1]
+        return
+
+    transpiled = transpile_all(circuits, workers)
+    job_size = job_size or len(transpiled)
+    options = {} if seed is None else {"seed_simulator": seed}
+
+    for start in range(0, len(transpiled), job_size):
+        jobs = transpiled[start:start + job_size]
+        result = backend_manager.backend.run(jobs, shots=shots, **options).result()
+        for i in range(len(jobs)):
+            yield result.get_counts(i)
+
+
+def run_algorithm_batch(algorithm, n, shots=DEFAULT_SHOTS, seed=None, workers=None, job_size=None):
+    """
+    Run an algorithm for every secret string of length n and yield one row per
+    secret with its most frequent outcome and the probability of the correct one.
+    """
+    secrets = all_secrets(n)
+    circuits = [BUILDERS[algorithm](secret) for secret in secrets]
+    for secret, counts in zip(secrets, run_batch(circuits, shots, seed, workers, job_size)):
+        expected = expected_outcome(secret)
+        top = max(counts, key=counts.get)
+        yield {
+            "secret": secret,
+            "top_outcome": top,
+            "correct": top == expected,
+            "success_probability": counts.get(expected, 0) / shots
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an algorithm for every secret string of length n")
+    parser.add_argument("algorithm", choices=BUILDERS)
+    parser.add_argument("n", type=int, help="Secret string length")
+    parser.add_argument("--shots", type=int, default=DEFAULT_SHOTS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="Transpilation processes")
+    parser.add_argument("--job-size", type=int, default=None, help="Circuits per Aer job (default: all)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = 0
+    failures = 0
+    for row in run_algorithm_batch(args.algorithm, args.n, args.shots, args.seed, args.workers, args.job_size):
+        rows += 1
+        failures += not row["correct"]
+        print(f"{row['secret']}  top {row['top_outcome']}  P(correct) {row['success_probability']:.3f}"
+              f"{'' if row['correct'] else '  FAILED'}")
+    elapsed = time.perf_counter() - start
+
+    print(f"{rows} circuits, {failures} failures in {elapsed:.2f}s")
+    print(backend_manager.stats())
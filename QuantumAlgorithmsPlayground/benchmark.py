@@ -0,0 +1,55 @@
+import argparse
+import time
+
+import numpy as np
+from backend import BackendManager
+import bernstein_vazirani
+import deutsch_jozsa
+
+WIDTHS = (8, 16, 32, 64, 128, 256, 512, 1000, 2000)
+
+# Widest circuit also timed with the dense statevector method for comparison
+MAX_DENSE_WIDTH = 24
+
+
+def timed(run):
+    start = time.perf_counter()
+    value = run()
+    return time.perf_counter() - start, value
+
+
+def benchmark_width(n, shots=1024, seed=0):
+    """
+    Time Bernstein-Vazirani and Deutsch-Jozsa on n input qubits through simulate(),
+    which routes these Clifford circuits to the stabilizer method.
+    """
+    secret = "".join(np.random.default_rng(seed + n).choice(["0", "1"], n))
+    rows = []
+    for name, qc, expected in [
+        ("bernstein_vazirani", bernstein_vazirani.build_circuit(secret), secret[::-1]),
+        ("deutsch_jozsa", deutsch_jozsa.build_circuit(n), None)
+    ]:
+        manager = BackendManager()
+        elapsed, (_, counts) = timed(lambda: manager.simulate(qc, shots, seed=0))
+        row = {"algorithm": name, "qubits": qc.num_qubits, "stabilizer_s": elapsed, "dense_s": None}
+        if expected is not None:
+            row["correct"] = max(counts, key=counts.get) == expected
+        if qc.num_qubits <= MAX_DENSE_WIDTH:
+            dense = manager.transpile(qc)
+            row["dense_s"], _ = timed(lambda: manager.backend.run(dense, shots=shots, method="statevector").result())
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark stabilizer simulation of wide BV/DJ circuits")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(WIDTHS))
+    parser.add_argument("--shots", type=int, default=1024)
+    args = parser.parse_args()
+
+    for n in args.widths:
+        for row in benchmark_width(n, args.shots):
+            dense = f"{row['dense_s'] * 1e3:10.2f} ms" if row["dense_s"] is not None else f"{'-':>13}"
+            check = {True: "ok", False: "WRONG"}.get(row.get("correct"), "")
+            print(f"{row['algorithm']:<20} {row['qubits']:>5} qubits  stabilizer {row['stabilizer_s'] * 1e3:10.2f} ms"
+                  f"  dense {dense}  {check}")
@@ -1,8 +1,8 @@
 from qiskit import QuantumCircuit
 from qiskit.circuit.library import ZGate
 
-def build_circuit():
-    n = 3  # Number of input qubits
+def build_circuit(n=3):
+    # n: number of input qubits
     qc = QuantumCircuit(n + 1, n)
 
     # Initialize last qubit to |1>
@@ -1,34 +1,90 @@
+import math
+from functools import lru_cache
 from qiskit import QuantumCircuit
 from qiskit.circuit.library import ZGate
 
-def build_circuit(oracle_string="11"):
-    n = len(oracle_string)
-    qc = QuantumCircuit(n, n)
+def parse_marked_states(oracle_string):
+    """
+    Sorted, de-duplicated marked states from a comma-separated oracle string such as "101,011".
+    """
+    marked = sorted({state.strip() for state in oracle_string.split(",") if state.strip()})
+    if not marked:
+        raise ValueError("Enter at least one marked state, e.g. 101")
+    if len({len(state) for state in marked}) != 1 or any(set(state) - {"0", "1"} for state in marked):
+        raise ValueError("Marked states must be bitstrings of equal length")
+    return tuple(marked)
 
-    # Step 1: Hadamard all qubits
-    qc.h(range(n))
+def optimal_iterations(n, marked_count):
+    """
+    floor(pi/4 * sqrt(N/M)) oracle + diffuser rounds for M marked states out of N = 2^n.
+    """
+    return math.floor(math.pi / 4 * math.sqrt(2 ** n / marked_count))
 
-    # Step 2: Oracle (Z gate on target state)
-    oracle = QuantumCircuit(n)
-    for i, bit in enumerate(oracle_string):
-        if bit == '0':
-            oracle.x(i)
-    oracle.h(n - 1)
-    oracle.mcx(list(range(n - 1)), n - 1)
-    oracle.h(n - 1)
-    for i, bit in enumerate(oracle_string):
-        if bit == '0':
-            oracle.x(i)
-    qc.append(oracle.to_gate(label="Oracle"), range(n))
-
-    # Step 3: Diffuser
-    qc.h(range(n))
-    qc.x(range(n))
+def success_probability(n, marked_count, iterations):
+    """
+    Probability that one shot measures a marked state: sin^2((2k + 1) * theta), sin(theta) = sqrt(M/N).
+    """
+    theta = math.asin(math.sqrt(marked_count / 2 ** n))
+    return math.sin((2 * iterations + 1) * theta) ** 2
+
+def phase_flip_all_ones(qc, n):
+    # Multi-controlled Z on all qubits; a single qubit just needs Z
+    if n == 1:
+        qc.z(0)
+        return
     qc.h(n - 1)
     qc.mcx(list(range(n - 1)), n - 1)
     qc.h(n - 1)
-    qc.x(range(n))
+
+@lru_cache(maxsize=64)
+def grover_gates(n, marked):
+    """
+    Oracle and diffuser gates for n qubits and a tuple of marked states, built once per pair.
+    """
+    oracle = QuantumCircuit(n)
+    for state in marked:
+        zeros = [i for i, bit in enumerate(state) if bit == '0']
+        if zeros:
+            oracle.x(zeros)
+        phase_flip_all_ones(oracle, n)
+        if zeros:
+            oracle.x(zeros)
+
+    diffuser = QuantumCircuit(n)
+    diffuser.h(range(n))
+    diffuser.x(range(n))
+    phase_flip_all_ones(diffuser, n)
+    diffuser.x(range(n))
+    diffuser.h(range(n))
+
+    return oracle.to_gate(label="Oracle"), diffuser.to_gate(label="Diffuser")
+
+def build_circuit(oracle_string="11", iterations=None):
+    """
+    Grover search for the comma-separated marked states in `oracle_string`, where
+    bit i of a state is qubit i. Uses the optimal number of iterations unless given;
+    the iteration count and per-shot success probability are stored in qc.metadata.
+    """
+    marked = parse_marked_states(oracle_string)
+    n = len(marked[0])
+    if iterations is None:
+        iterations = optimal_iterations(n, len(marked))
+    oracle, diffuser = grover_gates(n, marked)
+
+    qc = QuantumCircuit(n, n)
+
+    # Step 1: Hadamard all qubits
     qc.h(range(n))
 
+    # Step 2: Oracle + diffuser rounds
+    for _ in range(iterations):
+        qc.append(oracle, range(n))
+        qc.append(diffuser, range(n))
+
     qc.measure(range(n), range(n))
+    qc.metadata = {
+        "marked": list(marked),
+        "iterations": iterations,
+        "success_probability": success_probability(n, len(marked), iterations)
+    }
     return qc
@@ -1,11 +1,61 @@
-import matplotlib.pyplot as plt
-from qiskit.visualization import plot_histogram, circuit_drawer
+from qiskit.visualization import circuit_drawer
 
-def show_circuit(qc):
-    fig = circuit_drawer(qc, output="mpl")
-    plt.show()
+# Largest circuits drawn with the matplotlib drawer; anything bigger is drawn as text
+MAX_MPL_QUBITS = 12
+MAX_MPL_OPS = 150
+
+# Text drawing cost grows quickly with width, so wider circuits are only summarised
+MAX_TEXT_QUBITS = 64
+TEXT_FOLD = 100
+
+# Most frequent outcomes shown in the histogram, and the longest label drawn in full
+MAX_BARS = 32
+MAX_LABEL = 16
+
+
+def use_mpl_drawer(qc):
+    return qc.num_qubits <= MAX_MPL_QUBITS and qc.size() <= MAX_MPL_OPS
+
+
+def circuit_text(qc, fold=TEXT_FOLD):
+    """
+    Folded text drawing of qc, or a summary of its size and gates when it is too
+    wide to draw. Safe to call off the Tk thread.
+    """
+    if qc.num_qubits <= MAX_TEXT_QUBITS:
+        return str(circuit_drawer(qc, output="text", fold=fold))
+    ops = ", ".join(f"{name}: {count}" for name, count in qc.count_ops().items())
+    return (f"{qc.num_qubits} qubits, {qc.num_clbits} classical bits, depth {qc.depth()}\n"
+            f"Gates: {ops}\n"
+            f"(too wide to draw; the diagram is shown for up to {MAX_TEXT_QUBITS} qubits)")
+
+
+def draw_circuit(ax, qc):
+    ax.clear()
+    circuit_drawer(qc, output="mpl", ax=ax)
+
+
+def short_label(outcome):
+    if len(outcome) <= MAX_LABEL:
+        return outcome
+    half = (MAX_LABEL - 1) // 2
+    return f"{outcome[:half]}…{outcome[-half:]}"
+
+
+def draw_histogram(ax, counts, title="Measurement Results"):
+    """
+    Bar chart of the MAX_BARS most frequent outcomes on an existing axes.
+    """
+    top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:MAX_BARS]
+    top.sort()
+    total = sum(counts.values())
+    ax.clear()
+    ax.bar(range(len(top)), [count / total for _, count in top], color="#648fff")
+    ax.set_xticks(range(len(top)))
+    ax.set_xticklabels([short_label(outcome) for outcome, _ in top], rotation=70, fontsize=8)
+    ax.set_ylabel("Probability")
+    ax.set_ylim(0, 1)
+    if len(counts) > len(top):
+        title = f"{title} (top {len(top)} of {len(counts)})"
+    ax.set_title(title)
 
-def show_results(result, counts):
-    plot_histogram(counts)
-    plt.title("Measurement Results")
-    plt.show()
@@ -1,14 +1,78 @@
 import tkinter as tk
 from tkinter import ttk
-from qiskit import QuantumCircuit
-from qiskit.quantum_info import Statevector
-from qiskit.visualization.bloch import Bloch
+from qiskit.visualization.bloch import Arrow3D, Bloch
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 
+# Gates whose unitary depends on the slider angle
+PARAMETRIC_GATES = ('Rx', 'Ry', 'Rz', 'U3')
+
+# Angles precomputed per parametric gate over the slider range; 0 evaluates
+# the closed form on every update instead
+TABLE_STEPS = 2048
+
+FIXED_GATES = {
+    'I': np.eye(2),
+    'X': np.array([[0, 1], [1, 0]]),
+    'Y': np.array([[0, -1j], [1j, 0]]),
+    'Z': np.array([[1, 0], [0, -1]]),
+    'H': np.array([[1, 1], [1, -1]]) / np.sqrt(2),
+    'S': np.diag([1, 1j]),
+    'T': np.diag([1, np.exp(1j * np.pi / 4)]),
+    'SX': np.array([[1 + 1j, 1 - 1j], [1 - 1j, 1 + 1j]]) / 2,
+    'SDG': np.diag([1, -1j]),
+    'TDG': np.diag([1, np.exp(-1j * np.pi / 4)])
+}
+
+
+def gate_unitaries(gate, angles):
+    """
+    Closed-form 2x2 unitaries of `gate` for an array of angles, with shape angles.shape + (2, 2).
+    U3 uses theta = angle, phi = angle / 2, lambda = angle / 3.
+    """
+    angles = np.asarray(angles, dtype=float)
+    u = np.empty(angles.shape + (2, 2), dtype=complex)
+    if gate in FIXED_GATES:
+        u[...] = FIXED_GATES[gate]
+        return u
+
+    c, s = np.cos(angles / 2), np.sin(angles / 2)
+    if gate == 'Rx':
+        u[..., 0, 0], u[..., 0, 1], u[..., 1, 0], u[..., 1, 1] = c, -1j * s, -1j * s, c
+    elif gate == 'Ry':
+        u[..., 0, 0], u[..., 0, 1], u[..., 1, 0], u[..., 1, 1] = c, -s, s, c
+    elif gate == 'Rz':
+        u[..., 0, 0], u[..., 0, 1], u[..., 1, 0], u[..., 1, 1] = np.exp(-0.5j * angles), 0, 0, np.exp(0.5j * angles)
+    elif gate == 'U3':
+        phi, lam = angles / 2, angles / 3
+        u[..., 0, 0], u[..., 0, 1] = c, -np.exp(1j * lam) * s
+        u[..., 1, 0], u[..., 1, 1] = np.exp(1j * phi) * s, np.exp(1j * (phi + lam)) * c
+    else:
+        raise ValueError(f"Unknown gate '{gate}'")
+    return u
+
+
+def bloch_vectors(states):
+    """
+    Bloch vectors (x, y, z) of single-qubit states a|0> + b|1> given as an array
+    of shape (..., 2): x + iy = 2 conj(a) b and z = |a|^2 - |b|^2.
+    """
+    a, b = states[..., 0], states[..., 1]
+    ab = 2 * np.conj(a) * b
+    return np.stack([ab.real, ab.imag, np.abs(a) ** 2 - np.abs(b) ** 2], axis=-1)
+
+
+def bloch_table(gate, steps=TABLE_STEPS):
+    """
+    Bloch vectors of gate|0> at `steps` evenly spaced angles over [-pi, pi].
+    """
+    angles = np.linspace(-np.pi, np.pi, steps)
+    return bloch_vectors(gate_unitaries(gate, angles)[..., :, 0])
+
+
 class QuantumBlochApp:
-    def __init__(self, root):
+    def __init__(self, root, table_steps=TABLE_STEPS):
         self.root = root
         self.root.title("Quantum Gate Bloch Visualizer")
         self.root.geometry("1000x600")
@@ -21,6 +85,15 @@ class QuantumBlochApp:
             'Rx', 'Ry', 'Rz', 'U3'
         ]
 
+        # Bloch vector lookup tables for the parametric gates, built on first use
+        self.table_steps = table_steps
+        self.tables = {}
+
+        # Slider events arriving faster than the canvas redraws are coalesced
+        # into a single update scheduled with after_idle
+        self.update_pending = False
+        self.background = None
+
         self.create_widgets()
         self.update_bloch_sphere()
 
@@ -38,7 +111,7 @@ class QuantumBlochApp:
         gate_menu.grid(row=0, column=1, padx=5)
 
         self.angle_slider = ttk.Scale(control_frame, from_=-np.pi, to=np.pi, orient=tk.HORIZONTAL,
-                                      variable=self.angle, command=lambda _: self.update_bloch_sphere(), length=200)
+                                      variable=self.angle, command=lambda _: self.schedule_update(), length=200)
         self.angle_label = ttk.Label(control_frame, text="Angle: 0.00 rad")
 
         self.angle_slider.grid(row=0, column=2, padx=10)
@@ -48,55 +121,65 @@ class QuantumBlochApp:
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
         self.canvas.get_tk_widget().pack()
 
+        # The spheres are rendered once; only the final-state vector moves
+        b1 = Bloch(axes=self.ax1)
+        b1.add_vectors([0, 0, 1])
+        b1.render(title="Before Gate")
+
+        self.bloch = Bloch(axes=self.ax2)
+        self.bloch.render()
+        self.vector = Arrow3D([0, 0], [0, 0], [0, 1], mutation_scale=self.bloch.vector_mutation,
+                              lw=self.bloch.vector_width, arrowstyle=self.bloch.vector_style,
+                              color=self.bloch.vector_color[0], animated=True)
+        self.ax2.add_artist(self.vector)
+
+        # Every full redraw (gate change, resize, rotating the view) refreshes the
+        # cached background the vector is blitted onto
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
         export_btn = ttk.Button(self.root, text="Save Bloch Sphere Image", command=self.save_image)
         export_btn.pack(pady=5)
 
     def save_image(self):
+        self.vector.set_animated(False)
         self.fig.savefig("bloch_visualization.png")
+        self.vector.set_animated(True)
+
+    def final_bloch_vector(self, gate, angle):
+        if gate not in PARAMETRIC_GATES:
+            return bloch_vectors(FIXED_GATES[gate][:, 0])
+        if not self.table_steps:
+            return bloch_vectors(gate_unitaries(gate, angle)[:, 0])
+        if gate not in self.tables:
+            self.tables[gate] = bloch_table(gate, self.table_steps)
+        index = round((angle + np.pi) / (2 * np.pi) * (self.table_steps - 1))
+        return self.tables[gate][min(max(index, 0), self.table_steps - 1)]
+
+    def set_vector(self, vec):
+        # Same axes convention as Bloch.plot_vectors: -X and Y are swapped for plotting
+        self.vector.set_3d_properties(((0, 0), (vec[1], -vec[0])), (0, vec[2]), "z")
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax2.bbox)
+        self.ax2.draw_artist(self.vector)
+
+    def schedule_update(self):
+        if not self.update_pending:
+            self.update_pending = True
+            self.root.after_idle(self.update_vector)
+
+    def update_vector(self):
+        self.update_pending = False
+        angle = self.angle.get()
+        self.angle_label.config(text=f"Angle: {angle:.2f} rad")
+        self.set_vector(self.final_bloch_vector(self.gate_var.get(), angle))
 
-    def apply_gate(self, gate, angle=0.0):
-        qc = QuantumCircuit(1)
-        if gate == 'I':
-            pass
-        elif gate == 'X':
-            qc.x(0)
-        elif gate == 'Y':
-            qc.y(0)
-        elif gate == 'Z':
-            qc.z(0)
-        elif gate == 'H':
-            qc.h(0)
-        elif gate == 'S':
-            qc.s(0)
-        elif gate == 'T':
-            qc.t(0)
-        elif gate == 'SX':
-            qc.sx(0)
-        elif gate == 'SDG':
-            qc.sdg(0)
-        elif gate == 'TDG':
-            qc.tdg(0)
-        elif gate == 'Rx':
-            qc.rx(angle, 0)
-        elif gate == 'Ry':
-            qc.ry(angle, 0)
-        elif gate == 'Rz':
-            qc.rz(angle, 0)
-        elif gate == 'U3':
-            theta = angle
-            phi = angle / 2
-            lam = angle / 3
-            qc.u3(theta, phi, lam, 0)
-        return qc
-
-    def bloch_vector(self, state):
-        rho = np.outer(state, np.conj(state))
-        paulis = [
-            np.array([[0, 1], [1, 0]]),             # X
-            np.array([[0, -1j], [1j, 0]]),          # Y
-            np.array([[1, 0], [0, -1]])             # Z
-        ]
-        return [np.real(np.trace(rho @ p)) for p in paulis]
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.ax2.draw_artist(self.vector)
+        self.canvas.blit(self.ax2.bbox)
 
     def update_bloch_sphere(self):
         gate = self.gate_var.get()
@@ -104,31 +187,14 @@ class QuantumBlochApp:
         self.angle_label.config(text=f"Angle: {angle:.2f} rad")
 
         # Enable slider only for parametric gates
-        if gate in ['Rx', 'Ry', 'Rz', 'U3']:
+        if gate in PARAMETRIC_GATES:
             self.angle_slider.state(['!disabled'])
         else:
             self.angle_slider.state(['disabled'])
 
-        initial_sv = Statevector.from_label('0')
-        circuit = self.apply_gate(gate, angle)
-        final_sv = initial_sv.evolve(circuit)
-
-        vec1 = self.bloch_vector(initial_sv.data)
-        vec2 = self.bloch_vector(final_sv.data)
-
-        self.ax1.cla()
-        self.ax2.cla()
-
-        b1 = Bloch(axes=self.ax1)
-        b1.add_vectors(vec1)
-        b1.title = "Before Gate"
-
-        b2 = Bloch(axes=self.ax2)
-        b2.add_vectors(vec2)
-        b2.title = f"After {gate}"
-
-        b1.render()
-        b2.render()
+        # A new gate changes the title, so the whole figure is redrawn once
+        self.set_vector(self.final_bloch_vector(gate, angle))
+        self.ax2.set_title(f"After {gate}", fontsize=self.bloch.font_size, y=1.08)
         self.canvas.draw()
 
 